@@ -0,0 +1,87 @@
+import argparse
+import datetime
+import itertools
+import random
+import typing
+
+ENCODING = "cp1252"
+WRITE_BUFFER = 1 << 20
+
+# Anteil der Bereiche an allen Einträgen
+DEFAULT_TYPES: typing.Dict[str, int] = {
+    "018": 30, "060": 20, "050": 12, "000": 6, "001": 6, "140": 4, "020": 2, "021": 2,
+    "022": 1, "023": 1, "031": 1, "120": 1, "121": 1, "128": 1, "134": 1,
+}
+# Bereiche ohne @IN-Zeile
+SESSION_TYPES = {"000", "001", "020", "021", "022", "023", "120", "122", "128", "130", "132"}
+STATUS_WEIGHTS = (("0", 3), ("1", 10), ("2", 1), ("3", 2), ("4", 1))
+VALUES = ("X", "Y", "Zö", "  W  ", "Müller GmbH", "Straße 12", "0,00", "1.234,56 €", "", "J", "N")
+DESCRIPTIONS = ("Containererfassung - Pakete zuordnen", "Kundenstamm", "Artikelstamm", "Belege - Lieferschein", "Lieferantenstamm")
+
+def parse_types(value: str) -> typing.Dict[str, int]:
+    # 018=30,060=20,...
+    try:
+        types = {key.strip(): int(weight) for key, weight in (item.split("=") for item in value.split(","))}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ungültige Bereichsverteilung: {value}")
+    if not types or any(weight < 0 for weight in types.values()) or not sum(types.values()):
+        raise argparse.ArgumentTypeError(f"ungültige Bereichsverteilung: {value}")
+    return types
+
+def generate_blocks(seed: int = 1, types: typing.Dict[str, int] = DEFAULT_TYPES, changes: float = 3.0, users: int = 20, records: int = 5000,
+                    fields: int = 12, blank_lines: float = 0.02) -> typing.Iterator[str]:
+    # endlose Folge von Blöcken mit aufsteigenden Zeitpunkten; Datensätze sind ungleich verteilt, wenige werden sehr oft geändert
+    rng = random.Random(seed)
+    type_keys, type_weights = list(types), list(itertools.accumulate(types.values()))
+    statuses, status_weights = zip(*STATUS_WEIGHTS)
+    status_weights = list(itertools.accumulate(status_weights))
+    user_names = [str(700 + number) for number in range(users)]
+    record_weights = list(itertools.accumulate(1 / rank for rank in range(1, records + 1)))
+    record_keys = range(records)
+    date = datetime.datetime(2020, 1, 1, 6, 0, 0)
+    for number in itertools.count():
+        date += datetime.timedelta(seconds=rng.randint(0, 30))
+        protocol_type = rng.choices(type_keys, cum_weights=type_weights)[0]
+        status = rng.choices(statuses, cum_weights=status_weights)[0]
+        lines = [f"@PR,{protocol_type},{rng.choice(user_names)},{date:%d.%m.%Y},{date:%H:%M:%S},{status},Info ä {number}"]
+        if protocol_type not in SESSION_TYPES:
+            record = rng.choices(record_keys, cum_weights=record_weights)[0]
+            lines.append(f"@IN,CON{record:06d}{'':24}{rng.choice(DESCRIPTIONS):<60}")
+            if status in "01":
+                for _ in range(rng.randint(0, int(changes * 2))):
+                    lines.append(f"@AE,DBK{protocol_type}_0_{rng.randrange(fields)},{rng.choice(VALUES)}   ")
+        if rng.random() < blank_lines:
+            lines.append("   ")
+        lines.append("")
+        yield "\r\n".join(lines)
+
+def generate(path: str, size: int, **options) -> int:
+    # schreibt Blöcke, bis die Datei mindestens size Bytes groß ist, und liefert die Anzahl der Blöcke
+    written = 0
+    count = 0
+    with open(path, 'wb', buffering=WRITE_BUFFER) as fp:
+        for block in generate_blocks(**options):
+            if written >= size:
+                break
+            data = block.encode(ENCODING)
+            fp.write(data)
+            written += len(data)
+            count += 1
+    return count
+
+def main():
+    PARSER = argparse.ArgumentParser("benchmarks.generate", description="Erzeugt eine synthetische BWPROT20.DAT-Datei für Benchmarks")
+    PARSER.add_argument("--size", type=float, default=20, help="Größe der Datei in MB (Standard: 20)")
+    PARSER.add_argument("--seed", type=int, default=1, help="Startwert des Zufallsgenerators (Standard: 1)")
+    PARSER.add_argument("--types", type=parse_types, default=DEFAULT_TYPES, help="Verteilung der Bereiche, z.B. 018=30,060=20,000=5")
+    PARSER.add_argument("--changes", type=float, default=3.0, help="durchschnittliche Anzahl @AE-Zeilen je Eintrag mit Status 0 oder 1 (Standard: 3)")
+    PARSER.add_argument("--users", type=int, default=20, help="Anzahl der Benutzer (Standard: 20)")
+    PARSER.add_argument("--records", type=int, default=5000, help="Anzahl unterschiedlicher Datensätze (Standard: 5000)")
+    PARSER.add_argument("output", help="Datei, die erzeugt werden soll")
+
+    args = PARSER.parse_args()
+    count = generate(args.output, int(args.size * 1_000_000), seed=args.seed, types=args.types, changes=args.changes, users=args.users, records=args.records)
+    print(f"{args.output}: {count} Einträge")
+
+if __name__ == '__main__':
+    main()
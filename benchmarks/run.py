@@ -0,0 +1,142 @@
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import typing
+
+from benchmarks.generate import generate
+from bwprotanalyzer import LogFormatter, Protocol, ProtocolChange
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_THRESHOLD = 0.1
+
+class UntrackedProtocol(Protocol):
+    # liest Einträge ohne Feldhistorie, um die Kosten von update_field herauszurechnen
+
+    def update_field(self, index: str, dtype: str, field: str, value: str):
+        return ProtocolChange(field, value, "unbekannt")
+
+def count(entries: typing.Iterable) -> int:
+    number = 0
+    for number, _ in enumerate(entries, 1):
+        pass
+    return number
+
+def stage_parse(path: str) -> int:
+    return count(UntrackedProtocol(path).load_protocol())
+
+def stage_field_map(path: str) -> int:
+    return count(Protocol(path).load_protocol())
+
+def stage_render(path: str) -> int:
+    number = 0
+    def counted(entries):
+        nonlocal number
+        for number, entry in enumerate(entries, 1):
+            yield entry
+    formatter = LogFormatter()
+    with open(os.devnull, 'w', encoding=formatter.encoding) as sink:
+        formatter.write(counted(Protocol(path).load_protocol()), sink)
+    return number
+
+STAGES: typing.Dict[str, typing.Callable[[str], int]] = {
+    "parse": stage_parse,
+    "field_map": stage_field_map,
+    "render": stage_render,
+}
+
+def peak_rss() -> typing.Optional[float]:
+    # Spitzenwert des Arbeitsspeichers dieses Prozesses in MB, ohne resource-Modul (Windows) unbekannt
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1_000_000 if sys.platform == "darwin" else rss / 1000
+
+def run_stage(stage: str, path: str) -> typing.Tuple[float, int, typing.Optional[float]]:
+    start = time.perf_counter()
+    entries = STAGES[stage](path)
+    return time.perf_counter() - start, entries, peak_rss()
+
+def measure(stage: str, path: str, repeat: int) -> typing.Dict[str, typing.Any]:
+    # jede Messung in einem frischen Prozess, damit der Speicher-Spitzenwert nur diese Stufe enthält; die schnellste zählt
+    size = os.path.getsize(path)
+    runs = []
+    for _ in range(repeat):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs.append(pool.submit(run_stage, stage, path).result())
+    seconds, entries, rss = min(runs, key=lambda run: run[0])
+    return {
+        "seconds": round(seconds, 4),
+        "entries": entries,
+        "mb_per_s": round(size / 1_000_000 / seconds, 2),
+        "entries_per_s": round(entries / seconds),
+        "peak_rss_mb": None if rss is None else round(max(run[2] for run in runs), 1),
+    }
+
+def compare(results: typing.Dict[str, typing.Dict[str, typing.Any]], baseline: typing.Dict[str, typing.Any], threshold: float) -> typing.List[str]:
+    # Rückschritte gegenüber der Baseline: weniger Durchsatz oder mehr Speicher als threshold erlaubt
+    regressions = []
+    for stage, result in results.items():
+        base = baseline["stages"].get(stage)
+        if base is None:
+            continue
+        if result["mb_per_s"] < base["mb_per_s"] * (1 - threshold):
+            regressions.append(f"{stage}: {result['mb_per_s']} MB/s statt {base['mb_per_s']} MB/s")
+        if result["peak_rss_mb"] and base["peak_rss_mb"] and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{stage}: {result['peak_rss_mb']} MB Speicher statt {base['peak_rss_mb']} MB")
+    return regressions
+
+def print_results(results: typing.Dict[str, typing.Dict[str, typing.Any]]) -> None:
+    print(f"{'Stufe':<10} {'Zeit s':>8} {'MB/s':>8} {'Einträge/s':>12} {'Speicher MB':>12}")
+    for stage, result in results.items():
+        rss = "-" if result["peak_rss_mb"] is None else result["peak_rss_mb"]
+        print(f"{stage:<10} {result['seconds']:>8} {result['mb_per_s']:>8} {result['entries_per_s']:>12} {rss:>12}")
+
+def main():
+    PARSER = argparse.ArgumentParser("benchmarks.run", description="Misst Durchsatz und Speicherbedarf von bwprotanalyzer je Verarbeitungsstufe")
+    PARSER.add_argument("--stage", action="append", choices=tuple(STAGES), help="nur diese Stufe messen, mehrfach angebbar (Standard: alle)")
+    PARSER.add_argument("--repeat", type=int, default=3, help="Anzahl der Messungen je Stufe, die schnellste zählt (Standard: 3)")
+    PARSER.add_argument("--size", type=float, default=20, help="Größe der erzeugten Datei in MB, falls keine Eingabedatei angegeben ist (Standard: 20)")
+    PARSER.add_argument("--seed", type=int, default=1, help="Startwert für die erzeugte Datei (Standard: 1)")
+    PARSER.add_argument("--save", required=False, help="Ergebnisse als Baseline in diese JSON-Datei schreiben")
+    PARSER.add_argument("--baseline", required=False, help="Ergebnisse mit dieser Baseline vergleichen und bei Rückschritten mit Fehlercode beenden")
+    PARSER.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="erlaubte Abweichung zur Baseline als Anteil (Standard: 0.1)")
+    PARSER.add_argument("input", nargs="?", help="BWPROT20.DAT-Datei, ohne Angabe wird eine synthetische Datei erzeugt")
+
+    args = PARSER.parse_args()
+    stages = args.stage or list(STAGES)
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.input
+        if path is None:
+            path = os.path.join(directory, "BWPROT20.DAT")
+            generate(path, int(args.size * 1_000_000), seed=args.seed)
+        size = os.path.getsize(path)
+        results = {stage: measure(stage, path, args.repeat) for stage in stages}
+
+    print(f"{args.input or f'synthetisch, Startwert {args.seed}'}: {size / 1_000_000:.1f} MB")
+    print_results(results)
+    report = {"input": args.input, "seed": None if args.input else args.seed, "size": size, "stages": results}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as fp:
+            json.dump(report, fp, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fp:
+            baseline = json.load(fp)
+        if baseline["size"] != size:
+            print(f"Warnung: Baseline wurde mit einer Datei von {baseline['size']} Bytes gemessen, aktuell {size} Bytes", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Rückschritt bei {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,112 @@
 #!/usr/bin/env python
-from bwprotanalyzer import Protocol
+from bwprotanalyzer import Checkpoint, Protocol, ProtocolStatus
+from bwprotanalyzer.batch import FORMATTERS, run_batch, write_summary
+from bwprotanalyzer.history import SpillingFieldHistory
+from bwprotanalyzer.sources import expand_inputs, is_stream
+from bwprotanalyzer.stats import Stats, profiled
 import argparse
+import datetime
+import sys
+import time
+import zipfile
+
+DATE_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y")
+
+def parse_date(value: str, end_of_day: bool = False) -> datetime.datetime:
+    for date_format in DATE_FORMATS:
+        try:
+            date = datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        # ein reines Datum schließt bei --until den ganzen Tag ein
+        if end_of_day and date_format == "%d.%m.%Y":
+            date += datetime.timedelta(days=1, seconds=-1)
+        return date
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ungültiges Datum: {value}")
+
+def parse_status(value: str) -> ProtocolStatus:
+    try:
+        return ProtocolStatus(int(value)) if value.isdigit() else ProtocolStatus[value.upper()]
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"ungültiger Status: {value}")
 
 def main():
     PARSER = argparse.ArgumentParser("bwprotanalyzer", description="Analysiert eine BWPROT20.DAT-Datei, liest Änderungen und stellt (falls gewünscht) eine lesbare Log-Datei zur Verfügung")
-    PARSER.add_argument("--output", required=False, help="BWPROT20 als Log-Datei in die angegebene Datei ausgeben (falls gewünscht)")
-    PARSER.add_argument("input", help="Datei, welche eingelesen werden soll")
-    
+    PARSER.add_argument("--output", required=False, help="BWPROT20 als Log-Datei in die angegebene Datei ausgeben, bei mehreren Eingaben ohne --merge in dieses Verzeichnis (falls gewünscht)")
+    PARSER.add_argument("--format", choices=("log", "jsonl", "csv", "sqlite"), default="log", help="Ausgabeformat, sqlite benötigt --output (Standard: log)")
+    PARSER.add_argument("--jobs", type=int, default=1, help="Anzahl der Prozesse, mit denen die Datei parallel eingelesen wird, bei mehreren Eingaben je eine Datei pro Prozess (Standard: 1)")
+    PARSER.add_argument("--merge", action="store_true", help="alle Eingaben nach Zeitpunkt geordnet in eine gemeinsame Ausgabe schreiben, zwischengespeichert im temporären Verzeichnis")
+    PARSER.add_argument("--summary", action="store_true", help="statt des Logs eine Auswertung ausgeben: Änderungen je Benutzer und Stunde, häufigste Datensätze und Felder, Löschungen, Ausdrucke und Sitzungsdauern")
+    PARSER.add_argument("--checkpoint", required=False, help="Checkpoint-Datei, ab deren Stand nur neue Einträge gelesen werden; der letzte Eintrag folgt, sobald ein weiterer angehängt wurde (falls gewünscht)")
+    PARSER.add_argument("--history-limit", type=int, required=False, help="höchstens so viele Felder der Feldhistorie im Speicher halten, ältere werden auf die Festplatte ausgelagert (falls gewünscht)")
+    PARSER.add_argument("--follow", action="store_true", help="Datei weiter beobachten und neue Einträge fortlaufend ausgeben")
+    PARSER.add_argument("--interval", type=float, default=2.0, help="Sekunden zwischen zwei Prüfungen bei --follow (Standard: 2)")
+    PARSER.add_argument("--user", required=False, help="nur Einträge dieses Benutzers ausgeben")
+    PARSER.add_argument("--type", dest="protocol_type", metavar="TYPE", required=False, help="nur Einträge dieses Bereichs ausgeben, z.B. 018")
+    PARSER.add_argument("--index", required=False, help="nur Einträge dieses Datensatzes ausgeben, z.B. CON002")
+    PARSER.add_argument("--status", type=parse_status, required=False, help="nur Einträge mit diesem Status ausgeben (Zahl oder Name, z.B. CHANGE)")
+    PARSER.add_argument("--since", type=parse_date, required=False, help="nur Einträge ab diesem Zeitpunkt ausgeben (TT.MM.JJJJ [HH:MM[:SS]])")
+    PARSER.add_argument("--until", type=lambda value: parse_date(value, end_of_day=True), required=False, help="nur Einträge bis zu diesem Zeitpunkt ausgeben (TT.MM.JJJJ [HH:MM[:SS]])")
+    PARSER.add_argument("--stats", action="store_true", help="am Ende Laufzeit, Zähler und Zeiten je Verarbeitungsstufe auf stderr ausgeben")
+    PARSER.add_argument("--progress", type=float, required=False, metavar="SECONDS", help="alle SECONDS Sekunden den Fortschritt auf stderr ausgeben, bei mehreren Eingaben nach der jeweils fertigen Datei (falls gewünscht)")
+    PARSER.add_argument("--profile", required=False, help="cProfile-Daten des Laufs in diese Datei schreiben, auswertbar mit python -m pstats (falls gewünscht)")
+    PARSER.add_argument("input", nargs="+", help="Dateien, Globs oder .gz/.zip-Archive, welche eingelesen werden sollen")
+
     args = PARSER.parse_args()
-    proto = Protocol(args.input)
-    
-    if args.output:
-        proto.to_log_file(args.output)
-    else:
-        proto.to_stdout()
+    query = {key: getattr(args, key) for key in ("user", "protocol_type", "index", "status", "since", "until") if getattr(args, key) is not None}
+    if query and (args.follow or args.checkpoint):
+        PARSER.error("Filter können nicht mit --follow oder --checkpoint kombiniert werden")
+    if args.format == "sqlite" and not args.output:
+        PARSER.error("--format sqlite benötigt --output")
+    if args.summary and (args.follow or args.format != "log"):
+        PARSER.error("--summary kann nicht mit --follow oder --format kombiniert werden")
+    if args.history_limit is not None and args.history_limit < 1:
+        PARSER.error("--history-limit muss mindestens 1 sein")
+    try:
+        inputs = expand_inputs(args.input)
+    except (OSError, zipfile.BadZipFile) as error:
+        PARSER.error(str(error))
+    batch = len(inputs) > 1 or args.merge
+    if (batch or is_stream(inputs[0])) and (query or args.checkpoint or args.follow):
+        PARSER.error("Filter, --checkpoint und --follow sind nur mit einer einzelnen, nicht komprimierten Datei möglich")
+    stats = Stats(progress_interval=args.progress or 0) if args.stats or args.progress else None
+
+    succeeded = True
+    try:
+        with profiled(args.profile):
+            if batch:
+                succeeded = run_batch(Protocol, inputs, args.jobs, args.output, args.format, args.merge, args.history_limit, stats, args.summary)
+            else:
+                checkpoint = Checkpoint(args.checkpoint) if args.checkpoint or args.follow else None
+                field_history = SpillingFieldHistory(args.history_limit) if args.history_limit else None
+                proto = Protocol(inputs[0], jobs=args.jobs, checkpoint=checkpoint, raw_timestamps=args.summary or args.format == "sqlite", field_history=field_history, stats=stats)
+                formatter = FORMATTERS[args.format]() if args.format in FORMATTERS else None
+                run(proto, args, query, formatter)
+    except KeyboardInterrupt:
+        pass
+    if args.stats:
+        stats.report()
+    if not succeeded:
+        sys.exit(1)
+
+def run(proto: Protocol, args: argparse.Namespace, query: dict, formatter) -> None:
+    while True:
+        entries = proto.query(**query) if query else None
+        if args.summary:
+            write_summary(proto.summarize(entries), args.output)
+        elif args.format == "sqlite":
+            proto.to_sqlite(args.output, entries)
+        elif args.output:
+            proto.to_log_file(args.output, entries, formatter)
+        else:
+            proto.to_stdout(entries, formatter)
+            sys.stdout.flush()
+        if not args.follow:
+            break
+        time.sleep(args.interval)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,135 @@
+import concurrent.futures
+import contextlib
+import heapq
+import itertools
+import operator
+import os
+import re
+import sys
+import tempfile
+import typing
+import zipfile
+
+from bwprotanalyzer.export import CsvFormatter, JsonLinesFormatter, SqliteExporter
+from bwprotanalyzer.formatter import LogFormatter
+from bwprotanalyzer.history import SpillingFieldHistory
+from bwprotanalyzer.stats import Stats, TimedSink
+from bwprotanalyzer.store import StoredEntry, read_run, write_run
+from bwprotanalyzer.summary import Summary
+
+FORMATTERS = {"log": LogFormatter, "jsonl": JsonLinesFormatter, "csv": CsvFormatter}
+EXTENSIONS = {"log": ".log", "jsonl": ".jsonl", "csv": ".csv", "sqlite": ".sqlite"}
+
+# eine unlesbare Datei wird gemeldet, die übrigen werden weiter verarbeitet
+READ_ERRORS = (OSError, EOFError, zipfile.BadZipFile)
+
+FileResult = typing.Tuple[typing.Optional[Summary], typing.Optional[typing.Dict[str, typing.Any]], bool]
+
+def output_name(path: str, output_format: str) -> str:
+    # filiale1/BWPROT20.DAT.gz -> filiale1_BWPROT20.DAT.gz.log
+    return re.sub(r"[\\/:]+", "_", os.path.normpath(path)).strip("._") + EXTENSIONS[output_format]
+
+def process_file(protocol_class, path: str, output: typing.Optional[str], output_format: str, history_limit: typing.Optional[int], instrumented: bool,
+                 summary: bool = False, run: bool = False) -> FileResult:
+    # läuft im Worker mit eigener Feldhistorie; bei summary geht nur die Auswertung an den Hauptprozess
+    # bei run ist output die Lauf-Datei, aus der der Hauptprozess liest
+    field_history = SpillingFieldHistory(history_limit) if history_limit else None
+    proto = protocol_class(path, raw_timestamps=summary or output_format == "sqlite", field_history=field_history, stats=Stats() if instrumented else None)
+    result = None
+    try:
+        if summary:
+            result = proto.summarize()
+        elif run:
+            write_run(proto.load_protocol(), output)
+        elif output_format == "sqlite":
+            proto.to_sqlite(output)
+        else:
+            proto.to_log_file(output, formatter=FORMATTERS[output_format]())
+    except READ_ERRORS as error:
+        sys.stderr.write(f"{path}: {error}\n")
+        # keine unvollständige Ausgabe neben denen der lesbaren Dateien zurücklassen
+        if output is not None and os.path.exists(output):
+            os.remove(output)
+        return None, None, False
+    return result, proto.stats.totals() if instrumented else None, True
+
+def run_batch(protocol_class, paths: typing.List[str], jobs: int = 1, output: typing.Optional[str] = None, output_format: str = "log", merge: bool = False,
+              history_limit: typing.Optional[int] = None, stats: typing.Optional[Stats] = None, summary: bool = False) -> bool:
+    # ohne merge entsteht je Datei eine Ausgabe im Verzeichnis output, ohne output alle nacheinander auf stdout; summary ergibt eine gemeinsame Auswertung
+    # liefert False, wenn mindestens eine Datei nicht gelesen werden konnte
+    per_file = output is not None and not merge and not summary
+    merge = merge and not summary
+    # Einträge für eine gemeinsame Ausgabe werden je Datei als Lauf zwischengespeichert, damit nicht alle Dateien gleichzeitig im Speicher liegen
+    run = not per_file and not summary
+    count = len(paths)
+    with contextlib.ExitStack() as stack:
+        if run:
+            directory = stack.enter_context(tempfile.TemporaryDirectory(prefix="bwprotanalyzer-"))
+            targets = [os.path.join(directory, f"{number}.run") for number in range(count)]
+        else:
+            if per_file:
+                os.makedirs(output, exist_ok=True)
+            targets = [os.path.join(output, output_name(path, output_format)) if per_file else None for path in paths]
+        columns = ([protocol_class] * count, paths, targets, [output_format] * count, [history_limit] * count, [stats is not None] * count, [summary] * count, [run] * count)
+        if jobs > 1:
+            pool = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=jobs))
+            results = pool.map(process_file, *columns)
+        else:
+            results = map(process_file, *columns)
+        return collect(results, targets, output, output_format, merge, stats, summary)
+
+def drain_run(path: str) -> typing.Iterator[StoredEntry]:
+    # ein vollständig gelesener Lauf wird sofort gelöscht
+    yield from read_run(path)
+    os.remove(path)
+
+def collect(results: typing.Iterable[FileResult], targets: typing.List[typing.Optional[str]], output: typing.Optional[str], output_format: str, merge: bool,
+            stats: typing.Optional[Stats], summary: bool = False) -> bool:
+    succeeded = []
+
+    def finished():
+        # Ergebnis und Ziel jeder erfolgreich gelesenen Datei in Reihenfolge der Eingaben, sobald sie fertig ist
+        for (result, totals, success), target in zip(results, targets):
+            succeeded.append(success)
+            if totals is not None:
+                stats.merge(totals)
+            if stats is not None:
+                stats.file_finished(len(succeeded), len(targets))
+            if success:
+                yield result, target
+
+    if summary:
+        total = Summary()
+        for result, target in finished():
+            total.merge(result)
+        write_summary(total, output)
+        return all(succeeded)
+    if merge:
+        # jede Datei ist in sich zeitlich geordnet, gleiche Zeitpunkte behalten die Reihenfolge der Eingaben; je Lauf wird nur ein Stück gelesen
+        runs = [read_run(target) for result, target in list(finished())]
+        entries = heapq.merge(*runs, key=operator.attrgetter("date"))
+    elif output is not None:
+        # die Worker haben ihre Ausgabe bereits geschrieben
+        for _ in finished():
+            pass
+        return all(succeeded)
+    else:
+        # die Ausgabe beginnt, sobald die erste Datei fertig ist, die übrigen werden währenddessen weiter eingelesen
+        entries = itertools.chain.from_iterable(drain_run(target) for result, target in finished())
+    if output_format == "sqlite":
+        SqliteExporter(output).write(entries)
+        return all(succeeded)
+    formatter = FORMATTERS[output_format]()
+    if output is None:
+        formatter.write(entries, sys.stdout if stats is None else TimedSink(sys.stdout, stats))
+    else:
+        with open(output, 'w', encoding=formatter.encoding) as fp:
+            formatter.write(entries, fp if stats is None else TimedSink(fp, stats))
+    return all(succeeded)
+
+def write_summary(summary: Summary, output: typing.Optional[str] = None) -> None:
+    if output is None:
+        sys.stdout.write(summary.render())
+    else:
+        with open(output, 'w', encoding='utf-8') as fp:
+            fp.write(summary.render())
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import typing
+
+FINGERPRINT_SIZE = 4096
+CHECKPOINT_VERSION = 2
+
+def fingerprint(path: str, offset: int) -> typing.Tuple[str, str]:
+    # Prüfsummen über den Anfang der Datei und die Bytes direkt vor offset
+    with open(path, 'rb') as fp:
+        head = fp.read(min(offset, FINGERPRINT_SIZE))
+        tail_start = max(0, offset - FINGERPRINT_SIZE)
+        fp.seek(tail_start)
+        tail = fp.read(offset - tail_start)
+    return hashlib.sha1(head).hexdigest(), hashlib.sha1(tail).hexdigest()
+
+class Checkpoint:
+
+    def __init__(self, path: typing.Optional[str] = None) -> None:
+        self.path = path
+        self.offset = 0
+        self.head = ""
+        self.tail = ""
+        # Feldhistorie aus der Datei, wird beim ersten Fortsetzen übernommen
+        # als Liste von [Datensatz, Bereich, Feld, Wert]
+        self.fields: typing.Optional[typing.List[typing.List[str]]] = None
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as fp:
+            data = json.load(fp)
+        if data.get("version") != CHECKPOINT_VERSION:
+            return
+        self.offset = data["offset"]
+        self.head = data["head"]
+        self.tail = data["tail"]
+        self.fields = data["fields"]
+
+    def matches(self, file: str) -> bool:
+        # False, wenn die Datei seit dem Checkpoint gekürzt oder ersetzt wurde
+        if self.offset == 0:
+            return True
+        if os.path.getsize(file) < self.offset:
+            return False
+        return fingerprint(file, self.offset) == (self.head, self.tail)
+
+    def reset(self):
+        self.offset = 0
+        self.head = ""
+        self.tail = ""
+        self.fields = None
+
+    def update(self, file: str, offset: int, field_map) -> None:
+        if offset == self.offset:
+            return
+        self.offset = offset
+        self.head, self.tail = fingerprint(file, offset)
+        if self.path:
+            self.save(field_map)
+
+    def save(self, field_map) -> None:
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "offset": self.offset,
+            "head": self.head,
+            "tail": self.tail,
+            "fields": [[index, dtype, field, value] for (index, dtype, field), value in field_map.items()],
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as fp:
+            json.dump(data, fp, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.path)
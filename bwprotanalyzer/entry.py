@@ -0,0 +1,57 @@
+import typing
+import enum
+
+from bwprotanalyzer.timestamp import Timestamp, as_datetime
+
+class ProtocolStatus(enum.IntEnum):
+    NEW = 0
+    CHANGE = 1
+    DELETE = 2
+    PRINT = 3
+    DELETE_THROUGH_PROCESSING = 4
+
+class ProtocolChange:
+    __slots__ = ("field", "value", "previous_value")
+
+    def __init__(self, field: str, value: str, previous_value: str = "") -> None:
+        self.field = field
+        self.value = value
+        self.previous_value = previous_value
+    
+    def __str__(self) -> str:
+        return f"<Änderung {self.field}: {self.previous_value.strip()} -> {self.value.strip()}>"
+
+class ProtocolEntry:
+    __slots__ = ("protocol_type", "user", "date", "status", "index", "changes", "info", "index_info")
+
+    def __init__(self, protocol_type: int, user: str, date: Timestamp, status: ProtocolStatus, index: str, changes: typing.List[ProtocolChange] = [], info: str = "", index_info: str = ""):
+        self.protocol_type = protocol_type
+        self.user = user
+        self.date = date
+        self.status = status
+        self.index = index
+        self.changes = changes
+        self.info = info
+        self.index_info = index_info
+    
+    def __str__(self) -> str:
+        status_repr = ""
+        date = as_datetime(self.date)
+        if self.status == ProtocolStatus.NEW:
+            if self.protocol_type == "000":
+                status_repr = f"<Programmstart von Benutzer {self.user} am {date}>"
+            elif self.protocol_type == "001":
+                status_repr = f"<Programmende von Benutzer {self.user} am {date}>"
+            else:
+                status_repr = f"<Neuer Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        elif self.status == ProtocolStatus.CHANGE:
+            status_repr = f"<Geänderter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        elif self.status == ProtocolStatus.DELETE:
+            status_repr = f"<Gelöschter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        elif self.status == ProtocolStatus.PRINT:
+            status_repr = f"<Gedruckter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        elif self.status == ProtocolStatus.DELETE_THROUGH_PROCESSING:
+            status_repr = f"<Gewandelter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        else:
+            status_repr = f"<Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {date}>"
+        return status_repr
@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+import sqlite3
+import typing
+
+from bwprotanalyzer.entry import ProtocolEntry
+from bwprotanalyzer.timestamp import as_datetime, as_timestamp
+
+BATCH_SIZE = 10000
+BATCHES_PER_TRANSACTION = 50
+# Seitencache in KiB für das Sortieren beim Anlegen der Indizes
+SQLITE_CACHE_KIB = 65536
+
+CSV_COLUMNS = ("date", "protocol_type", "user", "status", "index", "info", "index_info", "field", "value", "previous_value")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    -- Sekunden seit 1970, lesbar mit datetime(date, 'unixepoch')
+    date INTEGER NOT NULL,
+    protocol_type TEXT NOT NULL,
+    user TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    info TEXT NOT NULL,
+    index_info TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    entry_id INTEGER NOT NULL REFERENCES entries (id),
+    position INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    previous_value TEXT NOT NULL
+);
+"""
+
+# erst nach dem Laden anlegen, damit die Inserts keine Indizes pflegen müssen
+SQLITE_INDEXES = """
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS entries_user ON entries (user, date);
+CREATE INDEX IF NOT EXISTS entries_record ON entries (record, protocol_type);
+CREATE INDEX IF NOT EXISTS changes_entry ON changes (entry_id);
+"""
+
+class JsonLinesFormatter:
+    encoding = "utf-8"
+
+    def write(self, entries: typing.Iterable[ProtocolEntry], sink: typing.TextIO, batch_size: int = BATCH_SIZE) -> None:
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        batch = []
+        for entry in entries:
+            batch.append(dumps({
+                "date": str(as_datetime(entry.date)),
+                "protocol_type": entry.protocol_type,
+                "user": entry.user,
+                "status": entry.status.name,
+                "index": entry.index,
+                "info": entry.info,
+                "index_info": entry.index_info,
+                "changes": [{"field": ch.field, "value": ch.value, "previous_value": ch.previous_value} for ch in entry.changes],
+            }))
+            if len(batch) >= batch_size:
+                batch.append("")
+                sink.write("\n".join(batch))
+                batch = []
+        if batch:
+            batch.append("")
+            sink.write("\n".join(batch))
+
+class CsvFormatter:
+    # eine Zeile je Änderung, Einträge ohne Änderungen erhalten eine Zeile mit leeren Änderungsspalten
+    encoding = "utf-8"
+
+    def __init__(self) -> None:
+        # bei --follow schreibt dieselbe Instanz bei jeder Prüfung in denselben Strom, z.B. eine Pipe
+        self.header_written = False
+
+    def write(self, entries: typing.Iterable[ProtocolEntry], sink: typing.TextIO, batch_size: int = BATCH_SIZE) -> None:
+        writer = csv.writer(sink, lineterminator="\n")
+        # Kopfzeile nur am Anfang einer Datei, beim Anhängen keine zweite
+        if sink.tell() == 0 if sink.seekable() else not self.header_written:
+            writer.writerow(CSV_COLUMNS)
+        self.header_written = True
+        batch = []
+        for entry in entries:
+            row = (str(as_datetime(entry.date)), entry.protocol_type, entry.user, entry.status.name, entry.index, entry.info, entry.index_info)
+            if entry.changes:
+                batch.extend(row + (ch.field, ch.value, ch.previous_value) for ch in entry.changes)
+            else:
+                batch.append(row + ("", "", ""))
+            if len(batch) >= batch_size:
+                writer.writerows(batch)
+                batch = []
+        writer.writerows(batch)
+
+class SqliteExporter:
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, append: bool = False) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        # ohne append wird eine bestehende Datenbank ersetzt, wie eine Log-Datei beim Schreiben
+        self.append = append
+
+    def write(self, entries: typing.Iterable[ProtocolEntry]) -> None:
+        if not self.append and os.path.exists(self.path):
+            os.remove(self.path)
+        fresh = not os.path.exists(self.path)
+        connection = sqlite3.connect(self.path)
+        try:
+            if fresh:
+                # eine abgebrochene neue Datenbank wird beim nächsten Lauf ohnehin ersetzt, bestehende Daten behalten ihr Journal
+                connection.execute("PRAGMA synchronous = OFF")
+                connection.execute("PRAGMA journal_mode = MEMORY")
+            connection.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+            connection.execute("PRAGMA temp_store = MEMORY")
+            connection.executescript(SQLITE_SCHEMA)
+            entry_id = connection.execute("SELECT coalesce(max(id), 0) FROM entries").fetchone()[0]
+            entry_rows = []
+            change_rows = []
+            batches = 0
+            for entry in entries:
+                entry_id += 1
+                entry_rows.append((entry_id, as_timestamp(entry.date), entry.protocol_type, entry.user, int(entry.status), entry.index, entry.info, entry.index_info))
+                if entry.changes:
+                    change_rows.extend((entry_id, position, ch.field, ch.value, ch.previous_value) for position, ch in enumerate(entry.changes))
+                if len(entry_rows) >= self.batch_size:
+                    self.insert(connection, entry_rows, change_rows)
+                    entry_rows, change_rows = [], []
+                    batches += 1
+                    if batches % BATCHES_PER_TRANSACTION == 0:
+                        connection.commit()
+            self.insert(connection, entry_rows, change_rows)
+            connection.commit()
+            connection.executescript(SQLITE_INDEXES)
+        finally:
+            connection.close()
+
+    def insert(self, connection: sqlite3.Connection, entry_rows: typing.List[tuple], change_rows: typing.List[tuple]) -> None:
+        connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", entry_rows)
+        connection.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?)", change_rows)
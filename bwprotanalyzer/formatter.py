@@ -0,0 +1,91 @@
+import typing
+
+from bwprotanalyzer.entry import ProtocolEntry, ProtocolStatus
+from bwprotanalyzer.timestamp import as_datetime
+
+BATCH_SIZE = 4096
+
+Renderer = typing.Callable[[ProtocolEntry], str]
+
+# Bereiche mit fester Meldung, unabhängig vom Status
+PROTOCOL_TYPES: typing.Dict[str, str] = {
+    "000": "{date}\t{protocol_type}\tSTART\t{user}\tBenutzer {user} hat sich angemeldet",
+    "001": "{date}\t{protocol_type}\tEND\t{user}\tBenutzer {user} hat sich abgemeldet",
+    "020": "{date}\t{protocol_type}\tKASSESTART\t{user}\tKasse {user} hat sich angemeldet",
+    "021": "{date}\t{protocol_type}\tKASSEEND\t{user}\tKasse {user} hat sich abgemeldet",
+    "022": "{date}\t{protocol_type}\tKASSEDSTART\t{user}\tKasse {user} hat einen Tagesstart durchgeführt",
+    "023": "{date}\t{protocol_type}\tKASSEDEND\t{user}\tKasse {user} hat einen Tagesabschluss durchgeführt",
+    "031": "{date}\t{protocol_type}\tBELCORRECT\t{user}\\Bediener {user} hat einen fehlerhaften Beleg automatisch korrigiert: {index}",
+    "120": "{date}\t{protocol_type}\tNOTEDELETE\t{user}\tBenutzer {user} hat Notiztexte gelöscht",
+    "121": "{date}\t{protocol_type}\tGLOBALCANCEL\t{user}\tBenutzer {user} hat einen globalen Abbruch verursacht: {info}",
+    "122": "{date}\t{protocol_type}\tREFERROR\t{user}\tBenutzer {user} hat einen Verweisfehler beim Laden einer Tabelle verursacht",
+    "123": "{date}\t{protocol_type}\tDIFFINDSATZ\t{user}\tBenutzer {user} hat eine Differenz zwischen Index und Satz festgestellt",
+    "126": "{date}\t{protocol_type}\tDUPLBELNR\t{user}\tBenutzer {user} hat versucht eine bestehende Belegnummer erneut anzulegen",
+    "128": "{date}\t{protocol_type}\tWAWILSTART\t{user}\tBenutzer {user} hat eine WAWI-Liste gestartet",
+    "130": "{date}\t{protocol_type}\tFIBULSTART\t{user}\tBenutzer {user} hat eine FIBU-Liste gestartet",
+    "132": "{date}\t{protocol_type}\tIMPSTART\t{user}\tBenutzer {user} hat einen Datenimport gestartet",
+    "134": "{date}\t{protocol_type}\tWANDLEND\t{user}\tBenutzer {user} hat die Wandlung eines Beleges abgeschlossen",
+    "136": "{date}\t{protocol_type}\tWANDLKOMPSTART\t{user}\tBenutzer {user} hat eine Komplettwandlung gestartet",
+    "138": "{date}\t{protocol_type}\tWANDLTEILSTART\t{user}\tBenutzer {user} hat eine Teilwandlung gestartet",
+    "140": "{date}\t{protocol_type}\tBELPOSDELETE\t{user}\tBenutzer {user} hat eine Belegposition gelöscht",
+    "142": "{date}\t{protocol_type}\tUPDWANDLTEIL\t{user}\tBenutzer {user} hat einen Beleg für eine Teilwandlung aufbereitet",
+    "144": "{date}\t{protocol_type}\tBWTOOL4\t{user}\tBenutzer {user} hat eine Wandlung mit bwtool4 durchgeführt",
+    "146": "{date}\t{protocol_type}\tTRYCATCH\t{user}\tBenutzer {user} hat einen try-Catch-Fehler verursacht",
+    "148": "{date}\t{protocol_type}\tTEMPBELSORTSTART\t{user}\tBenutzer {user} hat eine temporäre Belegsortierung gestartet",
+    "150": "{date}\t{protocol_type}\tTEMPBELSORTEND\t{user}\tBenutzer {user} hat eine temporäre Belegsortierung abgeschlossen",
+    "152": "{date}\t{protocol_type}\tTEMPBELSORTTABSTART\t{user}\tBenutzer {user} hat eine temporäre Belegsortierung/Tabelle gestartet",
+    "154": "{date}\t{protocol_type}\tTEMPBELSORTTABEND\t{user}\tBenutzer {user} hat eine temporäre Belegsortierung/Tabelle abgeschlossen",
+}
+
+CHANGE_TEMPLATE = "{date}\t{protocol_type}\tCHANGE\t{user}\tBenutzer {user} hat Datensatz {index} im Bereich {protocol_type} geändert:"
+
+def compile_template(template: str) -> Renderer:
+    fmt = template.format
+    return lambda entry: fmt(date=as_datetime(entry.date), protocol_type=entry.protocol_type, user=entry.user, index=entry.index, info=entry.info)
+
+render_change_header = compile_template(CHANGE_TEMPLATE)
+
+def render_change(entry: ProtocolEntry) -> str:
+    changes = [f"    {ch.field}: {ch.previous_value.strip()} -> {ch.value.strip()}" for ch in entry.changes if ch.value != ch.previous_value]
+    if changes:
+        return render_change_header(entry) + "\n" + "\n".join(changes)
+    return render_change_header(entry) + " Keine erkennbaren Änderungen"
+
+# alle übrigen Bereiche nach Status
+STATUS_TYPES: typing.Dict[ProtocolStatus, typing.Union[str, Renderer]] = {
+    ProtocolStatus.NEW: "{date}\t{protocol_type}\tNEW\t{user}\tBenutzer {user} hat einen neuen Datensatz im Bereich {protocol_type} angelegt: {index}",
+    ProtocolStatus.CHANGE: render_change,
+    ProtocolStatus.DELETE: "{date}\t{protocol_type}\tDELETE\t{user}\tBenutzer {user} hat Datensatz {index} im Bereich {protocol_type} gelöscht",
+    ProtocolStatus.PRINT: "{date}\t{protocol_type}\tPRINT\t{user}\tBenutzer {user} hat Datensatz {index} im Bereich {protocol_type} gedruckt",
+    ProtocolStatus.DELETE_THROUGH_PROCESSING: "{date}\t{protocol_type}\tDELETEWANDL\t{user}\tBenutzer {user} hat Beleg {index} durch Wandlung gelöscht",
+}
+
+class LogFormatter:
+    encoding = "cp1252"
+
+    def __init__(self, protocol_types: typing.Dict[str, typing.Union[str, Renderer]] = PROTOCOL_TYPES, status_types: typing.Dict[ProtocolStatus, typing.Union[str, Renderer]] = STATUS_TYPES) -> None:
+        self.protocol_types = {key: self.compile(value) for key, value in protocol_types.items()}
+        self.status_types = {key: self.compile(value) for key, value in status_types.items()}
+
+    def compile(self, value: typing.Union[str, Renderer]) -> Renderer:
+        return compile_template(value) if isinstance(value, str) else value
+
+    def render(self, entry: ProtocolEntry) -> typing.Optional[str]:
+        renderer = self.protocol_types.get(entry.protocol_type) or self.status_types.get(entry.status)
+        return renderer(entry) if renderer else None
+
+    def write(self, entries: typing.Iterable[ProtocolEntry], sink: typing.TextIO, batch_size: int = BATCH_SIZE) -> None:
+        # Zeilen sammeln und in großen Blöcken schreiben
+        render = self.render
+        batch = []
+        for entry in entries:
+            line = render(entry)
+            if line:
+                batch.append(line)
+                if len(batch) >= batch_size:
+                    batch.append("")
+                    sink.write("\n".join(batch))
+                    batch = []
+        if batch:
+            batch.append("")
+            sink.write("\n".join(batch))
@@ -0,0 +1,129 @@
+import collections
+import sqlite3
+import sys
+import typing
+
+# (Datensatz, Bereich, Feld)
+FieldKey = typing.Tuple[str, str, str]
+
+SPILL_BATCH_SIZE = 10000
+KEY_SEPARATOR = "\x1f"
+
+class FieldHistory:
+    # letzter Wert je Feld, Grundlage für ProtocolChange.previous_value
+
+    def __init__(self) -> None:
+        self.values: typing.Dict[FieldKey, str] = {}
+
+    def get(self, key: FieldKey) -> typing.Optional[str]:
+        return self.values.get(key)
+
+    def set(self, key: FieldKey, value: str) -> None:
+        if key not in self.values:
+            key = intern_key(key)
+        self.values[key] = value
+
+    def swap(self, key: FieldKey, value: str) -> typing.Optional[str]:
+        # setzt value und liefert den bisherigen Wert
+        values = self.values
+        previous = values.get(key)
+        if previous is None:
+            key = intern_key(key)
+        values[key] = value
+        return previous
+
+    def update(self, other: "FieldHistory") -> None:
+        for key, value in other.items():
+            self.set(key, value)
+
+    def items(self) -> typing.Iterator[typing.Tuple[FieldKey, str]]:
+        return iter(self.values.items())
+
+    def clear(self) -> None:
+        self.values.clear()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class SpillingFieldHistory(FieldHistory):
+    # hält höchstens capacity Felder im Speicher, die am längsten unbenutzten werden in eine SQLite-Datei ausgelagert
+
+    def __init__(self, capacity: int, path: str = "") -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.values: typing.OrderedDict[FieldKey, str] = collections.OrderedDict()
+        # ausgelagert, aber noch nicht geschrieben
+        self.pending: typing.Dict[FieldKey, str] = {}
+        # ohne Pfad legt SQLite eine temporäre Datei an, die beim Schließen gelöscht wird
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fields (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.spilled = self.connection.execute("SELECT count(*) FROM fields").fetchone()[0]
+
+    def get(self, key: FieldKey) -> typing.Optional[str]:
+        value = self.values.get(key)
+        if value is not None:
+            self.values.move_to_end(key)
+            return value
+        value = self.load(key)
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def set(self, key: FieldKey, value: str) -> None:
+        if key in self.values:
+            self.values.move_to_end(key)
+        else:
+            key = intern_key(key)
+        self.values[key] = value
+        if len(self.values) > self.capacity:
+            self.spill()
+
+    def swap(self, key: FieldKey, value: str) -> typing.Optional[str]:
+        previous = self.get(key)
+        self.set(key, value)
+        return previous
+
+    def load(self, key: FieldKey) -> typing.Optional[str]:
+        value = self.pending.get(key)
+        if value is not None or not self.spilled:
+            return value
+        row = self.connection.execute("SELECT value FROM fields WHERE key = ?", (KEY_SEPARATOR.join(key),)).fetchone()
+        return row[0] if row else None
+
+    def spill(self) -> None:
+        key, value = self.values.popitem(last=False)
+        self.pending[key] = value
+        if len(self.pending) >= SPILL_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO fields (key, value) VALUES (?, ?)", ((KEY_SEPARATOR.join(key), value) for key, value in self.pending.items()))
+        self.spilled += len(self.pending)
+        self.pending.clear()
+
+    def items(self) -> typing.Iterator[typing.Tuple[FieldKey, str]]:
+        # auch ausgelagerte Felder; im Speicher gehaltene Werte sind aktueller als die in der Datei
+        self.flush()
+        for key, value in self.connection.execute("SELECT key, value FROM fields"):
+            key = tuple(key.split(KEY_SEPARATOR))
+            if key not in self.values:
+                yield key, value
+        yield from list(self.values.items())
+
+    def clear(self) -> None:
+        self.values.clear()
+        self.pending.clear()
+        with self.connection:
+            self.connection.execute("DELETE FROM fields")
+        self.spilled = 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+def intern_key(key: FieldKey) -> FieldKey:
+    index, dtype, field = key
+    return sys.intern(index), sys.intern(dtype), sys.intern(field)
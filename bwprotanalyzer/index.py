@@ -0,0 +1,134 @@
+import contextlib
+import datetime
+import os
+import sqlite3
+import typing
+
+from bwprotanalyzer.checkpoint import fingerprint
+from bwprotanalyzer.scanner import complete_size, scan_file
+from bwprotanalyzer.timestamp import InvalidTimestamp, as_timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_offset INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    user TEXT NOT NULL,
+    protocol_type TEXT NOT NULL,
+    record TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    changes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks (timestamp);
+CREATE INDEX IF NOT EXISTS blocks_user ON blocks (user, timestamp);
+CREATE INDEX IF NOT EXISTS blocks_record ON blocks (record, protocol_type);
+CREATE INDEX IF NOT EXISTS blocks_type ON blocks (protocol_type, status);
+"""
+
+INSERT_BATCH_SIZE = 10000
+# ältere Indizes ohne Spalte changes werden neu aufgebaut
+INDEX_VERSION = "2"
+
+class ProtocolIndex:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        if self.get_meta("version") != INDEX_VERSION:
+            with self.connection:
+                self.connection.executescript("DROP TABLE blocks; DROP TABLE meta;")
+                self.connection.executescript(SCHEMA)
+                self.set_meta(version=INDEX_VERSION)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_meta(self, key: str, default: str = "") -> str:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, **values) -> None:
+        self.connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [(key, str(value)) for key, value in values.items()])
+
+    def update(self, proto) -> None:
+        # indiziert neu angehängte Blöcke, eine gekürzte oder rotierte Datei wird komplett neu indiziert
+        offset = int(self.get_meta("offset", "0"))
+        last_block = int(self.get_meta("last_block", "0"))
+        if offset and (os.path.getsize(proto.file) < offset or fingerprint(proto.file, offset) != (self.get_meta("head"), self.get_meta("tail"))):
+            with self.connection:
+                self.connection.execute("DELETE FROM blocks")
+            offset = last_block = 0
+        end = complete_size(proto.file)
+        if end == offset:
+            return
+
+        # der zuletzt indizierte Block kann inzwischen weitere Zeilen erhalten haben
+        with self.connection:
+            batch = []
+            for block_offset, block in scan_file(proto.file, last_block, end):
+                last_block = block_offset
+                try:
+                    batch.append(self.index_row(proto, block_offset, block))
+                except InvalidTimestamp as error:
+                    # wie beim Einlesen wird der Block übersprungen
+                    proto.report_error(block_offset, error)
+                    continue
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    self.insert(batch)
+                    batch = []
+            self.insert(batch)
+            head, tail = fingerprint(proto.file, end)
+            self.set_meta(offset=end, last_block=last_block, head=head, tail=tail)
+
+    def insert(self, rows: typing.List[tuple]) -> None:
+        self.connection.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def index_row(self, proto, block_offset: int, block: typing.List[str]) -> tuple:
+        protocol_type, user, date, time, status, info = proto.parse_pr_line(block[0])
+        record = proto.parse_in_line(block[1])[0] if len(block) > 1 else ""
+        # alle Zeilen nach @IN sind @AE-Zeilen
+        return block_offset, proto.timestamp_parser.parse(date, time), user, protocol_type, record, int(status), max(0, len(block) - 2)
+
+    def select(self, user: typing.Optional[str] = None, protocol_type: typing.Optional[str] = None, index: typing.Optional[str] = None, status: typing.Optional[int] = None,
+               since: typing.Optional[datetime.datetime] = None, until: typing.Optional[datetime.datetime] = None) -> typing.List[typing.Tuple[int, bool]]:
+        # liefert (Offset, Treffer) für alle Treffer sowie die Blöcke mit Änderungen desselben Datensatzes und Bereichs
+        # vor dessen letztem Treffer, aus denen die Feldhistorie der Treffer aufgebaut wird
+        conditions = []
+        params = []
+        for column, value in (("user", user), ("protocol_type", protocol_type), ("record", index), ("status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(as_timestamp(since))
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(as_timestamp(until))
+        where = " AND ".join(conditions) or "1"
+        # in der Verknüpfung mit last sind record und protocol_type nicht eindeutig
+        blocks_where = " AND ".join(f"blocks.{condition}" for condition in conditions) or "1"
+        # der letzte Treffer je Datensatz und Bereich wird einmal gruppiert bestimmt, nicht je Block in einer korrelierten Unterabfrage
+        sql = f"""
+            WITH last AS (
+                SELECT record, protocol_type, max(block_offset) AS last_offset FROM blocks
+                WHERE record != '' AND {where}
+                GROUP BY record, protocol_type
+            )
+            SELECT block_offset, 1 FROM blocks WHERE {where}
+            UNION ALL
+            SELECT blocks.block_offset, 0 FROM last JOIN blocks ON blocks.record = last.record AND blocks.protocol_type = last.protocol_type
+            WHERE blocks.block_offset < last.last_offset AND blocks.changes > 0 AND NOT ({blocks_where})
+            ORDER BY block_offset
+        """
+        return [(block_offset, bool(selected)) for block_offset, selected in self.connection.execute(sql, params * 3)]
+
+@contextlib.contextmanager
+def open_index(proto, path: typing.Optional[str] = None) -> typing.Iterator[ProtocolIndex]:
+    index = ProtocolIndex(path or f"{proto.file}.idx")
+    try:
+        index.update(proto)
+        yield index
+    finally:
+        index.close()
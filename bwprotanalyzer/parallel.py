@@ -0,0 +1,67 @@
+import collections
+import concurrent.futures
+import mmap
+import os
+import typing
+
+from bwprotanalyzer.history import FieldKey
+from bwprotanalyzer.scanner import find_block
+from bwprotanalyzer.stats import Stats
+from bwprotanalyzer.store import ProtocolStore
+
+CHUNKS_PER_JOB = 4
+
+def split_file(path: str, parts: int, start: int = 0, end: typing.Optional[int] = None) -> typing.List[typing.Tuple[int, int]]:
+    # teilt den Bereich start..end an @PR-Grenzen in höchstens parts Teilstücke
+    with open(path, 'rb') as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if end is None:
+            end = size
+        if size == 0 or start >= end:
+            return []
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            bounds = []
+            for number in range(parts):
+                pos = find_block(buffer, start + (end - start) * number // parts, end)
+                if pos == -1:
+                    break
+                if not bounds or pos > bounds[-1]:
+                    bounds.append(pos)
+    return list(zip(bounds, bounds[1:] + [end]))
+
+def parse_chunk(protocol_class, path: str, start: int, end: int, instrumented: bool = False):
+    # läuft im Worker mit leerer Feldhistorie, die Vorwerte werden in merge_field_map ergänzt
+    # ein ProtocolStore lässt sich um ein Vielfaches schneller übertragen als einzelne Einträge und speichert Zeitpunkte ohnehin als Sekunden
+    proto = protocol_class(path, raw_timestamps=True, stats=Stats() if instrumented else None)
+    store = ProtocolStore()
+    # Zeile in den Änderungsspalten und Schlüssel der jeweils ersten Änderung je Feld
+    first_changes: typing.List[typing.Tuple[int, FieldKey]] = []
+    seen = set()
+    for entry in proto.load_blocks(start, end):
+        row = len(store.change_fields)
+        for change in entry.changes:
+            key = (entry.index, entry.protocol_type, change.field)
+            if key not in seen:
+                seen.add(key)
+                first_changes.append((row, key))
+            row += 1
+        store.append(entry)
+    return store, first_changes, proto.__field_map__, proto.stats.totals() if instrumented else None
+
+def parse_parallel(proto, jobs: int, start: int = 0, end: typing.Optional[int] = None):
+    chunks = split_file(proto.file, jobs * CHUNKS_PER_JOB, start, end)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = collections.deque()
+        for chunk_start, chunk_end in chunks:
+            pending.append(pool.submit(parse_chunk, type(proto), proto.file, chunk_start, chunk_end, proto.stats is not None))
+            if len(pending) > jobs * 2:
+                yield from merge_result(proto, pending.popleft().result())
+        while pending:
+            yield from merge_result(proto, pending.popleft().result())
+
+def merge_result(proto, result):
+    store, first_changes, field_map, totals = result
+    proto.merge_field_map(store, first_changes, field_map)
+    if totals is not None:
+        proto.stats.merge(totals)
+    return store
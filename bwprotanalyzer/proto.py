@@ -1,95 +1,132 @@
 import sys
-from io import TextIOWrapper
 import typing
 import datetime
-import enum
 
-class ProtocolStatus(enum.IntEnum):
-    NEW = 0
-    CHANGE = 1
-    DELETE = 2
-    PRINT = 3
-    DELETE_THROUGH_PROCESSING = 4
+from bwprotanalyzer.checkpoint import Checkpoint
+from bwprotanalyzer.entry import ProtocolChange, ProtocolEntry, ProtocolStatus
+from bwprotanalyzer.export import CsvFormatter, JsonLinesFormatter, SqliteExporter
+from bwprotanalyzer.formatter import LogFormatter
+from bwprotanalyzer.history import FieldHistory, FieldKey
+from bwprotanalyzer.index import open_index
+from bwprotanalyzer.parallel import parse_parallel
+from bwprotanalyzer.scanner import LineCounter, complete_blocks_size, read_blocks, scan_file
+from bwprotanalyzer.sources import is_stream, open_stream, scan_stream
+from bwprotanalyzer.stats import Stats
+from bwprotanalyzer.store import ProtocolStore
+from bwprotanalyzer.summary import Summary
+from bwprotanalyzer.timestamp import InvalidTimestamp, Timestamp, TimestampParser, from_timestamp
 
-class ProtocolChange:
+DEFAULT_FORMATTER = LogFormatter()
 
-    def __init__(self, field: str, value: str, previous_value: str = "") -> None:
-        self.field = field
-        self.value = value
-        self.previous_value = previous_value
-    
-    def __str__(self) -> str:
-        return f"<Änderung {self.field}: {self.previous_value.strip()} -> {self.value.strip()}>"
-
-class ProtocolEntry:
-
-    def __init__(self, protocol_type: int, user: str, date: datetime.datetime, status: ProtocolStatus, index: str, changes: typing.List[ProtocolChange] = [], info: str = "", index_info: str = ""):
-        self.protocol_type = protocol_type
-        self.user = user
-        self.date = date
-        self.status = status
-        self.index = index
-        self.changes = changes
-        self.info = info
-        self.index_info = index_info
-    
-    def __str__(self) -> str:
-        status_repr = ""
-        if self.status == ProtocolStatus.NEW:
-            if self.protocol_type == "000":
-                status_repr = f"<Programmstart von Benutzer {self.user} am {self.date}>"
-            elif self.protocol_type == "001":
-                status_repr = f"<Programmende von Benutzer {self.user} am {self.date}>"
-            else:
-                status_repr = f"<Neuer Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        elif self.status == ProtocolStatus.CHANGE:
-            status_repr = f"<Geänderter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        elif self.status == ProtocolStatus.DELETE:
-            status_repr = f"<Gelöschter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        elif self.status == ProtocolStatus.PRINT:
-            status_repr = f"<Gedruckter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        elif self.status == ProtocolStatus.DELETE_THROUGH_PROCESSING:
-            status_repr = f"<Gewandelter Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        else:
-            status_repr = f"<Datensatz {self.index} in Bereich {self.protocol_type} von Benutzer {self.user} am {self.date}>"
-        return status_repr
+Formatter = typing.Union[LogFormatter, JsonLinesFormatter, CsvFormatter]
 
 class Protocol:
 
-    def __init__(self, file: str) -> None:
+    def __init__(self, file: str, jobs: int = 1, checkpoint: typing.Optional[Checkpoint] = None, raw_timestamps: bool = False,
+                 field_history: typing.Optional[FieldHistory] = None, stats: typing.Optional[Stats] = None) -> None:
         self.file = file
+        self.jobs = jobs
+        self.checkpoint = checkpoint
+        # Zeitpunkte als Sekunden seit 1970 statt als datetime
+        self.raw_timestamps = raw_timestamps
+        self.timestamp_parser = TimestampParser()
+        self.line_counter: typing.Optional[LineCounter] = None
         self.protocol = []
 
-        self.__field_map__: typing.Dict[str, ProtocolChange] = {}
+        # letzter Wert je Feld, z.B. SpillingFieldHistory für Dateien mit sehr vielen Datensätzen
+        self.__field_map__ = field_history if field_history is not None else FieldHistory()
         self.__protocol_buffer__: typing.List[str] = []
+
+        # Zeitmessung nur auf Wunsch, sonst bleiben alle Methoden unverändert
+        self.stats = stats
+        if stats is not None:
+            stats.attach(self)
     
     def load_protocol(self):
-        with open(self.file, 'r', encoding='cp1252') as fp:
-            protocol_block = []
-            first_line = True
-            for line in fp:
-                if line.strip() == "": continue
-                if line[:3] == "@PR":
-                    if not first_line:
-                        yield self.process_block(protocol_block)
-                    else:
-                        first_line = False
-                    protocol_block = []
-                protocol_block.append(line)
+        start, end = 0, None
+        if self.checkpoint is not None:
+            # der letzte Block wird erst gelesen, wenn ein weiterer folgt, damit der Checkpoint an einer Blockgrenze liegt
+            start, end = self.resume(), complete_blocks_size(self.file)
+        # Archive lassen sich nicht an Blockgrenzen aufteilen
+        if self.jobs > 1 and not is_stream(self.file):
+            yield from parse_parallel(self, self.jobs, start, end)
+        else:
+            yield from self.load_blocks(start, end)
+        if self.checkpoint is not None:
+            self.checkpoint.update(self.file, end, self.__field_map__)
+
+    def query(self, user: typing.Optional[str] = None, protocol_type: typing.Optional[str] = None, index: typing.Optional[str] = None, status: typing.Optional[ProtocolStatus] = None,
+              since: typing.Optional[datetime.datetime] = None, until: typing.Optional[datetime.datetime] = None):
+        # liest über den Index nur passende Blöcke; die Feldhistorie wird aus den früheren Blöcken desselben Datensatzes aufgebaut
+        with open_index(self) as sidecar:
+            rows = sidecar.select(user, protocol_type, index, status, since, until)
+        selected = {offset for offset, match in rows if match}
+        replay = type(self)(self.file, raw_timestamps=self.raw_timestamps, stats=self.stats)
+        for offset, entry in replay.process_blocks(read_blocks(self.file, [offset for offset, match in rows])):
+            if offset in selected:
+                yield entry
+
+    def load_store(self) -> ProtocolStore:
+        return ProtocolStore.from_entries(self.load_protocol())
+
+    def resume(self) -> int:
+        # Offset, ab dem weitergelesen wird; eine gekürzte oder rotierte Datei wird komplett neu eingelesen
+        if not self.checkpoint.matches(self.file):
+            self.checkpoint.reset()
+            self.__field_map__.clear()
+        elif self.checkpoint.fields is not None:
+            self.__field_map__.clear()
+            for index, dtype, field, value in self.checkpoint.fields:
+                self.__field_map__.set((index, dtype, field), value)
+            self.checkpoint.fields = None
+        return self.checkpoint.offset
+
+    def resumes(self) -> bool:
+        # True, wenn ab einem Checkpoint weitergelesen wird; muss vor dem Öffnen der Ausgabe geprüft werden
+        return self.checkpoint is not None and self.resume() > 0
+
+    def load_blocks(self, start: int = 0, end: typing.Optional[int] = None):
+        for offset, entry in self.process_blocks(self.scan(start, end)):
+            yield entry
+
+    def scan(self, start: int = 0, end: typing.Optional[int] = None):
+        if is_stream(self.file):
+            return scan_stream(self.file)
+        return scan_file(self.file, start, end)
+
+    def process_blocks(self, blocks: typing.Iterable[typing.Tuple[int, typing.List[str]]]):
+        # Blöcke mit ungültigem Zeitpunkt werden gemeldet und übersprungen
+        for offset, block in blocks:
+            try:
+                entry = self.process_block(block)
+            except InvalidTimestamp as error:
+                self.report_error(offset, error)
+            else:
+                yield offset, entry
+
+    def report_error(self, offset: int, error: Exception):
+        if self.line_counter is None:
+            self.line_counter = LineCounter(self.file, open_stream)
+        sys.stderr.write(f"{self.file}, Zeile {self.line_counter.line_at(offset)}: {error}\n")
     
     def process_block(self, block: typing.List[str]):
         protocol_type, user, date, time, status, info = self.parse_pr_line(block[0])
+        timestamp = self.parse_timestamp(date, time)
         if len(block) < 2:
-            return ProtocolEntry(protocol_type, user, datetime.datetime.strptime(f"{date} {time}", "%d.%m.%Y %H:%M:%S"), ProtocolStatus(int(status)), "", info=info)
+            return ProtocolEntry(protocol_type, user, timestamp, ProtocolStatus(int(status)), "", info=info)
         true_index, index_info = self.parse_in_line(block[1])
         ae_block = block[2:]
         changes = [self.update_field(true_index, protocol_type, *self.parse_ae_line(line)) for line in ae_block]
-        entry = ProtocolEntry(protocol_type, user, datetime.datetime.strptime(f"{date} {time}", "%d.%m.%Y %H:%M:%S"), ProtocolStatus(int(status)), true_index, changes, info, index_info)
+        entry = ProtocolEntry(protocol_type, user, timestamp, ProtocolStatus(int(status)), true_index, changes, info, index_info)
         return entry
+
+    def parse_timestamp(self, date: str, time: str) -> Timestamp:
+        seconds = self.timestamp_parser.parse(date, time)
+        return seconds if self.raw_timestamps else from_timestamp(seconds)
     
     def parse_pr_line(self, line: str):
         # @PR,018,700,14.11.2020,21:00:00,1,PutRelation 00018
-        split = line.split(",")
+        split = line.split(",", 7)
         protocol_type = split[1]
         user = split[2]
         date = split[3]
@@ -100,187 +137,44 @@ class Protocol:
 
     def parse_in_line(self, line: str):
         # @IN,CON002                                                       Containererfassung - Pakete zuordnen                        
-        split = line.split(",")
-        index = split[1]
+        index = line.split(",", 2)[1]
         true_index = index.split()[0]
         index_info = index[len(true_index):].strip()
         return true_index, index_info
     
     def parse_ae_line(self, line: str):
         # @AE,DBK86_0_6,CON002
-        split = line.split(",")
+        split = line.split(",", 3)
         field = split[1]
         value = split[2]
         return field, value
     
     def update_field(self, index: str, dtype: str, field: str, value: str):
-        map_idx = f"{index}_{dtype}_{field}"
-        if map_idx in self.__field_map__:
-            change = self.__field_map__[map_idx]
-            new_change = ProtocolChange(field, value, change.value)
-            self.__field_map__[map_idx] = new_change
-        else:
-            new_change = ProtocolChange(field, value, "unbekannt")
-            self.__field_map__[map_idx] = new_change
-        return new_change
-    
-    def to_log_file(self, path):
-        with open(path, 'w', encoding='cp1252') as fp:
-            for entry in self.load_protocol():
-                line = None
-                if entry.protocol_type == "000":
-                    line = f"{entry.date}\t{entry.protocol_type}\tSTART\t{entry.user}\tBenutzer {entry.user} hat sich angemeldet"
-                elif entry.protocol_type == "001":
-                    line = f"{entry.date}\t{entry.protocol_type}\tEND\t{entry.user}\tBenutzer {entry.user} hat sich abgemeldet"
-                elif entry.protocol_type == "020":
-                    line = f"{entry.date}\t{entry.protocol_type}\tKASSESTART\t{entry.user}\tKasse {entry.user} hat sich angemeldet"
-                elif entry.protocol_type == "021":
-                    line = f"{entry.date}\t{entry.protocol_type}\tKASSEEND\t{entry.user}\tKasse {entry.user} hat sich abgemeldet"
-                elif entry.protocol_type == "022":
-                    line = f"{entry.date}\t{entry.protocol_type}\tKASSEDSTART\t{entry.user}\tKasse {entry.user} hat einen Tagesstart durchgeführt"
-                elif entry.protocol_type == "023":
-                    line = f"{entry.date}\t{entry.protocol_type}\tKASSEDEND\t{entry.user}\tKasse {entry.user} hat einen Tagesabschluss durchgeführt"
-                elif entry.protocol_type == "031":
-                    line = f"{entry.date}\t{entry.protocol_type}\tBELCORRECT\t{entry.user}\Bediener {entry.user} hat einen fehlerhaften Beleg automatisch korrigiert: {entry.index}"
-                elif entry.protocol_type == "120":
-                    line = f"{entry.date}\t{entry.protocol_type}\tNOTEDELETE\t{entry.user}\tBenutzer {entry.user} hat Notiztexte gelöscht"
-                elif entry.protocol_type == "121":
-                    line = f"{entry.date}\t{entry.protocol_type}\tGLOBALCANCEL\t{entry.user}\tBenutzer {entry.user} hat einen globalen Abbruch verursacht: {entry.info}"
-                elif entry.protocol_type == "122":
-                    line = f"{entry.date}\t{entry.protocol_type}\tREFERROR\t{entry.user}\tBenutzer {entry.user} hat einen Verweisfehler beim Laden einer Tabelle verursacht"
-                elif entry.protocol_type == "123":
-                    line = f"{entry.date}\t{entry.protocol_type}\tDIFFINDSATZ\t{entry.user}\tBenutzer {entry.user} hat eine Differenz zwischen Index und Satz festgestellt"
-                elif entry.protocol_type == "126":
-                    line = f"{entry.date}\t{entry.protocol_type}\tDUPLBELNR\t{entry.user}\tBenutzer {entry.user} hat versucht eine bestehende Belegnummer erneut anzulegen"
-                elif entry.protocol_type == "128":
-                    line = f"{entry.date}\t{entry.protocol_type}\tWAWILSTART\t{entry.user}\tBenutzer {entry.user} hat eine WAWI-Liste gestartet"
-                elif entry.protocol_type == "130":
-                    line = f"{entry.date}\t{entry.protocol_type}\tFIBULSTART\t{entry.user}\tBenutzer {entry.user} hat eine FIBU-Liste gestartet"
-                elif entry.protocol_type == "132":
-                    line = f"{entry.date}\t{entry.protocol_type}\tIMPSTART\t{entry.user}\tBenutzer {entry.user} hat einen Datenimport gestartet"
-                elif entry.protocol_type == "134":
-                    line = f"{entry.date}\t{entry.protocol_type}\tWANDLEND\t{entry.user}\tBenutzer {entry.user} hat die Wandlung eines Beleges abgeschlossen"
-                elif entry.protocol_type == "136":
-                    line = f"{entry.date}\t{entry.protocol_type}\tWANDLKOMPSTART\t{entry.user}\tBenutzer {entry.user} hat eine Komplettwandlung gestartet"
-                elif entry.protocol_type == "138":
-                    line = f"{entry.date}\t{entry.protocol_type}\tWANDLTEILSTART\t{entry.user}\tBenutzer {entry.user} hat eine Teilwandlung gestartet"
-                elif entry.protocol_type == "140":
-                    line = f"{entry.date}\t{entry.protocol_type}\tBELPOSDELETE\t{entry.user}\tBenutzer {entry.user} hat eine Belegposition gelöscht"
-                elif entry.protocol_type == "142":
-                    line = f"{entry.date}\t{entry.protocol_type}\tUPDWANDLTEIL\t{entry.user}\tBenutzer {entry.user} hat einen Beleg für eine Teilwandlung aufbereitet"
-                elif entry.protocol_type == "144":
-                    line = f"{entry.date}\t{entry.protocol_type}\tBWTOOL4\t{entry.user}\tBenutzer {entry.user} hat eine Wandlung mit bwtool4 durchgeführt"
-                elif entry.protocol_type == "146":
-                    line = f"{entry.date}\t{entry.protocol_type}\tTRYCATCH\t{entry.user}\tBenutzer {entry.user} hat einen try-Catch-Fehler verursacht"
-                elif entry.protocol_type == "148":
-                    line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung gestartet"
-                elif entry.protocol_type == "150":
-                    line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung abgeschlossen"
-                elif entry.protocol_type == "152":
-                    line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle gestartet"
-                elif entry.protocol_type == "154":
-                    line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle abgeschlossen"
+        previous_value = self.__field_map__.swap((index, dtype, field), value)
+        return ProtocolChange(field, value, "unbekannt" if previous_value is None else previous_value)
 
-                if line:
-                    fp.write(line + "\n")
-                    continue
+    def merge_field_map(self, store: ProtocolStore, first_changes: typing.List[typing.Tuple[int, FieldKey]], field_map: FieldHistory):
+        # store wurde mit leerer Feldhistorie eingelesen, die erste Änderung je Feld erhält ihren Vorwert von hier
+        for row, key in first_changes:
+            previous_value = self.__field_map__.get(key)
+            if previous_value is not None:
+                store.change_previous_values[row] = store.strings.code(previous_value)
+        self.__field_map__.update(field_map)
+    
+    def to_log_file(self, path, entries: typing.Optional[typing.Iterable[ProtocolEntry]] = None, formatter: Formatter = DEFAULT_FORMATTER):
+        # beim Fortsetzen ab einem Checkpoint wird die bestehende Log-Datei ergänzt, beim erneuten Einlesen ersetzt
+        mode = 'a' if self.resumes() else 'w'
+        with open(path, mode, encoding=formatter.encoding) as fp:
+            self.write_log(fp, entries, formatter)
 
-                if entry.status == ProtocolStatus.NEW:
-                    line = f"{entry.date}\t{entry.protocol_type}\tNEW\t{entry.user}\tBenutzer {entry.user} hat einen neuen Datensatz im Bereich {entry.protocol_type} angelegt: {entry.index}"
-                elif entry.status == ProtocolStatus.CHANGE:
-                    line = f"{entry.date}\t{entry.protocol_type}\tCHANGE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} geändert:"
-                    changes = [f"    {ch.field}: {ch.previous_value.strip()} -> {ch.value.strip()}" for ch in entry.changes if ch.value != ch.previous_value]
-                    if changes:
-                        changes_lines = "\n".join(changes)
-                        line = line + "\n" + changes_lines
-                    else:
-                        line = line + " Keine erkennbaren Änderungen"
-                elif entry.status == ProtocolStatus.DELETE:
-                    line = f"{entry.date}\t{entry.protocol_type}\tDELETE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gelöscht"
-                elif entry.status == ProtocolStatus.PRINT:
-                    line = f"{entry.date}\t{entry.protocol_type}\tPRINT\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gedruckt"
-                elif entry.status == ProtocolStatus.DELETE_THROUGH_PROCESSING:
-                    line = f"{entry.date}\t{entry.protocol_type}\tDELETEWANDL\t{entry.user}\tBenutzer {entry.user} hat Beleg {entry.index} durch Wandlung gelöscht"
-                
-                if line:
-                    fp.write(line + "\n")
+    def to_stdout(self, entries: typing.Optional[typing.Iterable[ProtocolEntry]] = None, formatter: Formatter = DEFAULT_FORMATTER):
+        self.write_log(sys.stdout, entries, formatter)
 
-    def to_stdout(self):
-        for entry in self.load_protocol():
-            line = None
-            if entry.protocol_type == "000":
-                line = f"{entry.date}\t{entry.protocol_type}\tSTART\t{entry.user}\tBenutzer {entry.user} hat sich angemeldet"
-            elif entry.protocol_type == "001":
-                line = f"{entry.date}\t{entry.protocol_type}\tEND\t{entry.user}\tBenutzer {entry.user} hat sich abgemeldet"
-            elif entry.protocol_type == "020":
-                line = f"{entry.date}\t{entry.protocol_type}\tKASSESTART\t{entry.user}\tKasse {entry.user} hat sich angemeldet"
-            elif entry.protocol_type == "021":
-                line = f"{entry.date}\t{entry.protocol_type}\tKASSEEND\t{entry.user}\tKasse {entry.user} hat sich abgemeldet"
-            elif entry.protocol_type == "022":
-                line = f"{entry.date}\t{entry.protocol_type}\tKASSEDSTART\t{entry.user}\tKasse {entry.user} hat einen Tagesstart durchgeführt"
-            elif entry.protocol_type == "023":
-                line = f"{entry.date}\t{entry.protocol_type}\tKASSEDEND\t{entry.user}\tKasse {entry.user} hat einen Tagesabschluss durchgeführt"
-            elif entry.protocol_type == "031":
-                line = f"{entry.date}\t{entry.protocol_type}\tBELCORRECT\t{entry.user}\Bediener {entry.user} hat einen fehlerhaften Beleg automatisch korrigiert: {entry.index}"
-            elif entry.protocol_type == "120":
-                line = f"{entry.date}\t{entry.protocol_type}\tNOTEDELETE\t{entry.user}\tBenutzer {entry.user} hat Notiztexte gelöscht"
-            elif entry.protocol_type == "121":
-                line = f"{entry.date}\t{entry.protocol_type}\tGLOBALCANCEL\t{entry.user}\tBenutzer {entry.user} hat einen globalen Abbruch verursacht: {entry.info}"
-            elif entry.protocol_type == "122":
-                line = f"{entry.date}\t{entry.protocol_type}\tREFERROR\t{entry.user}\tBenutzer {entry.user} hat einen Verweisfehler beim Laden einer Tabelle verursacht"
-            elif entry.protocol_type == "123":
-                line = f"{entry.date}\t{entry.protocol_type}\tDIFFINDSATZ\t{entry.user}\tBenutzer {entry.user} hat eine Differenz zwischen Index und Satz festgestellt"
-            elif entry.protocol_type == "126":
-                line = f"{entry.date}\t{entry.protocol_type}\tDUPLBELNR\t{entry.user}\tBenutzer {entry.user} hat versucht eine bestehende Belegnummer erneut anzulegen"
-            elif entry.protocol_type == "128":
-                line = f"{entry.date}\t{entry.protocol_type}\tWAWILSTART\t{entry.user}\tBenutzer {entry.user} hat eine WAWI-Liste gestartet"
-            elif entry.protocol_type == "130":
-                line = f"{entry.date}\t{entry.protocol_type}\tFIBULSTART\t{entry.user}\tBenutzer {entry.user} hat eine FIBU-Liste gestartet"
-            elif entry.protocol_type == "132":
-                line = f"{entry.date}\t{entry.protocol_type}\tIMPSTART\t{entry.user}\tBenutzer {entry.user} hat einen Datenimport gestartet"
-            elif entry.protocol_type == "134":
-                line = f"{entry.date}\t{entry.protocol_type}\tWANDLEND\t{entry.user}\tBenutzer {entry.user} hat die Wandlung eines Beleges abgeschlossen"
-            elif entry.protocol_type == "136":
-                line = f"{entry.date}\t{entry.protocol_type}\tWANDLKOMPSTART\t{entry.user}\tBenutzer {entry.user} hat eine Komplettwandlung gestartet"
-            elif entry.protocol_type == "138":
-                line = f"{entry.date}\t{entry.protocol_type}\tWANDLTEILSTART\t{entry.user}\tBenutzer {entry.user} hat eine Teilwandlung gestartet"
-            elif entry.protocol_type == "140":
-                line = f"{entry.date}\t{entry.protocol_type}\tBELPOSDELETE\t{entry.user}\tBenutzer {entry.user} hat eine Belegposition gelöscht"
-            elif entry.protocol_type == "142":
-                line = f"{entry.date}\t{entry.protocol_type}\tUPDWANDLTEIL\t{entry.user}\tBenutzer {entry.user} hat einen Beleg für eine Teilwandlung aufbereitet"
-            elif entry.protocol_type == "144":
-                line = f"{entry.date}\t{entry.protocol_type}\tBWTOOL4\t{entry.user}\tBenutzer {entry.user} hat eine Wandlung mit bwtool4 durchgeführt"
-            elif entry.protocol_type == "146":
-                line = f"{entry.date}\t{entry.protocol_type}\tTRYCATCH\t{entry.user}\tBenutzer {entry.user} hat einen try-Catch-Fehler verursacht"
-            elif entry.protocol_type == "148":
-                line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung gestartet"
-            elif entry.protocol_type == "150":
-                line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung abgeschlossen"
-            elif entry.protocol_type == "152":
-                line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle gestartet"
-            elif entry.protocol_type == "154":
-                line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle abgeschlossen"
+    def to_sqlite(self, path, entries: typing.Optional[typing.Iterable[ProtocolEntry]] = None):
+        SqliteExporter(path, append=self.resumes()).write(self.load_protocol() if entries is None else entries)
 
-            if line:
-                sys.stdout.write(line + "\n")
-                continue
+    def summarize(self, entries: typing.Optional[typing.Iterable[ProtocolEntry]] = None) -> Summary:
+        return Summary().update(self.load_protocol() if entries is None else entries)
 
-            if entry.status == ProtocolStatus.NEW:
-                line = f"{entry.date}\t{entry.protocol_type}\tNEW\t{entry.user}\tBenutzer {entry.user} hat einen neuen Datensatz im Bereich {entry.protocol_type} angelegt: {entry.index}"
-            elif entry.status == ProtocolStatus.CHANGE:
-                line = f"{entry.date}\t{entry.protocol_type}\tCHANGE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} geändert:"
-                changes = [f"    {ch.field}: {ch.previous_value.strip()} -> {ch.value.strip()}" for ch in entry.changes if ch.value != ch.previous_value]
-                if changes:
-                    changes_lines = "\n".join(changes)
-                    line = line + "\n" + changes_lines
-                else:
-                    line = line + " Keine erkennbaren Änderungen"
-            elif entry.status == ProtocolStatus.DELETE:
-                line = f"{entry.date}\t{entry.protocol_type}\tDELETE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gelöscht"
-            elif entry.status == ProtocolStatus.PRINT:
-                line = f"{entry.date}\t{entry.protocol_type}\tPRINT\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gedruckt"
-            elif entry.status == ProtocolStatus.DELETE_THROUGH_PROCESSING:
-                line = f"{entry.date}\t{entry.protocol_type}\tDELETEWANDL\t{entry.user}\tBenutzer {entry.user} hat Beleg {entry.index} durch Wandlung gelöscht"
-            
-            if line:
-                sys.stdout.write(line + "\n")
\ No newline at end of file
+    def write_log(self, sink: typing.TextIO, entries: typing.Optional[typing.Iterable[ProtocolEntry]] = None, formatter: Formatter = DEFAULT_FORMATTER):
+        formatter.write(self.load_protocol() if entries is None else entries, sink)
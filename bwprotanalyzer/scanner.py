@@ -0,0 +1,167 @@
+import bisect
+import itertools
+import mmap
+import operator
+import os
+import re
+import typing
+
+ENCODING = "cp1252"
+BLOCK_MARKER = b"\n@PR"
+# kleine Fenster bleiben beim Aufteilen und Zerlegen in Zeilen im Cache
+WINDOW_SIZE = 1 << 16
+
+# Zeichen, an denen str.splitlines() trennt, der Textmodus aber nicht
+SPLITLINES_EXTRA = ("\x0b", "\x0c", "\x1c", "\x1d", "\x1e")
+# leere bzw. nur aus Leerzeichen bestehende Zeilen samt vorangehendem Zeilenende
+BLANK_LINES = re.compile(r"\n[^\S\n]*(?=\n|\Z)")
+
+Block = typing.Tuple[int, typing.List[str]]
+
+def find_block(buffer, pos: int = 0, end: typing.Optional[int] = None) -> int:
+    # liefert den Offset des nächsten @PR am Zeilenanfang ab pos, -1 falls keiner existiert
+    if end is None:
+        end = len(buffer)
+    if pos >= end:
+        return -1
+    if (pos == 0 or buffer[pos - 1:pos] == b"\n") and buffer[pos:pos + 3] == b"@PR":
+        return pos
+    found = buffer.find(BLOCK_MARKER, pos, end)
+    return found + 1 if found != -1 else -1
+
+def has_extra_breaks(text: str) -> bool:
+    return any(char in text for char in SPLITLINES_EXTRA)
+
+def drop_blank(lines: typing.List[str]) -> typing.List[str]:
+    # leere bzw. nur aus Leerzeichen bestehende Zeilen entfernen, wie sie der Textmodus überspringt
+    return [line for line in lines if line and not line.isspace()]
+
+def blank_blocks(lines: typing.List[typing.List[str]]) -> typing.Set[int]:
+    # Nummern der Blöcke mit Leerzeilen; str.lstrip() gibt Zeilen, die mit "@" beginnen, ohne Kopie zurück
+    flat = map(str.lstrip, itertools.chain.from_iterable(lines))
+    positions = list(itertools.compress(itertools.count(), map(operator.not_, flat)))
+    if not positions:
+        return set()
+    ends = list(itertools.accumulate(map(len, lines)))
+    return {bisect.bisect_right(ends, position) for position in positions}
+
+def split_lines(block: str) -> typing.List[str]:
+    # Zeilenenden wie im Textmodus (\r\n, \r, \n), durch \n getrennte Leerzeilen sind bereits entfernt
+    if "\r" in block:
+        return [line for line in block.replace("\r", "\n").split("\n") if line and not line.isspace()]
+    return block.split("\n")
+
+def decode_block(chunk: bytes) -> typing.List[str]:
+    text = chunk.decode(ENCODING)
+    if has_extra_breaks(text):
+        return split_lines(BLANK_LINES.sub("", text.replace("\r\n", "\n")))
+    return drop_blank(text.splitlines())
+
+def split_window(start: int, text: str) -> typing.Iterator[Block]:
+    # text beginnt mit "@PR" und endet vor einem "@PR" am Zeilenanfang oder am Dateiende
+    blocks = text.split("\n@PR")
+    # bei cp1252 ist jedes Zeichen ein Byte; ab dem zweiten Block beginnt jeder nach dem "\n" des Trenners
+    sizes = map(operator.add, map(len, blocks[1:-1]), itertools.repeat(len(BLOCK_MARKER)))
+    offsets = itertools.accumulate(itertools.chain((start, len(blocks[0]) + 1), sizes))
+    if has_extra_breaks(text):
+        # selten: Zeilenenden wie im Textmodus nachbilden
+        parts = BLANK_LINES.sub("", text.replace("\r\n", "\n")).split("\n@PR")
+        return zip(offsets, map(split_lines, itertools.chain(parts[:1], map("@PR".__add__, parts[1:]))))
+    lines = list(map(str.splitlines, blocks))
+    # das "@PR" ist Teil des Trenners und fehlt den Blöcken ab dem zweiten
+    for block_lines in itertools.islice(lines, 1, None):
+        if block_lines:
+            block_lines[0] = "@PR" + block_lines[0]
+        else:
+            # eine Zeile, die nur aus "@PR" besteht
+            block_lines.append("@PR")
+    for number in blank_blocks(lines):
+        lines[number] = drop_blank(lines[number])
+    return zip(offsets, lines)
+
+def iter_blocks(buffer, start: int = 0, end: typing.Optional[int] = None) -> typing.Iterator[Block]:
+    if end is None:
+        end = len(buffer)
+    start = find_block(buffer, start, end)
+    while start != -1:
+        # Fenster von ca. WINDOW_SIZE Bytes, das immer an einer @PR-Grenze endet
+        found = buffer.find(BLOCK_MARKER, start + WINDOW_SIZE, end)
+        window_end = found + 1 if found != -1 else end
+        yield from split_window(start, buffer[start:window_end].decode(ENCODING))
+        start = window_end if found != -1 else -1
+
+def iter_stream(fp: typing.BinaryIO, chunk_size: int = WINDOW_SIZE) -> typing.Iterator[Block]:
+    # wie iter_blocks für Datenströme ohne mmap, z.B. entpackte Archive; Offsets beziehen sich auf die entpackten Daten
+    base = 0
+    pending = b""
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        # der Block ab dem letzten @PR kann im nächsten Stück weitergehen
+        cut = pending.rfind(BLOCK_MARKER) + 1
+        if cut <= 0:
+            continue
+        for offset, lines in iter_blocks(pending, 0, cut):
+            yield base + offset, lines
+        base += cut
+        pending = pending[cut:]
+    for offset, lines in iter_blocks(pending):
+        yield base + offset, lines
+
+def scan_file(path: str, start: int = 0, end: typing.Optional[int] = None) -> typing.Iterator[Block]:
+    with open(path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from iter_blocks(buffer, start, end)
+
+def complete_size(path: str) -> int:
+    # Größe bis einschließlich des letzten Zeilenumbruchs, eine unvollständige letzte Zeile wird noch nicht gelesen
+    with open(path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return buffer.rfind(b"\n") + 1
+
+def complete_blocks_size(path: str) -> int:
+    # Offset des letzten @PR-Blocks; alle Blöcke davor sind vollständig, an den letzten können noch @AE-Zeilen angehängt werden
+    with open(path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return buffer.rfind(BLOCK_MARKER) + 1
+
+def read_blocks(path: str, offsets: typing.Iterable[int]) -> typing.Iterator[Block]:
+    # liest einzelne Blöcke, deren Offsets z.B. aus dem Index stammen
+    with open(path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset in offsets:
+                found = buffer.find(BLOCK_MARKER, offset)
+                block_end = found + 1 if found != -1 else len(buffer)
+                yield offset, decode_block(buffer[offset:block_end])
+
+class LineCounter:
+    # Zeilennummern zu Offsets für Fehlermeldungen, zählt ab dem zuletzt abgefragten Offset weiter
+
+    def __init__(self, path: str, opener: typing.Callable[[str], typing.BinaryIO] = lambda path: open(path, 'rb')) -> None:
+        self.path = path
+        self.opener = opener
+        self.offset = 0
+        self.line = 1
+
+    def line_at(self, offset: int) -> int:
+        if offset < self.offset:
+            self.offset, self.line = 0, 1
+        with self.opener(self.path) as fp:
+            fp.seek(self.offset)
+            while self.offset < offset:
+                chunk = fp.read(min(WINDOW_SIZE, offset - self.offset))
+                if not chunk:
+                    break
+                self.line += chunk.count(b"\n")
+                self.offset += len(chunk)
+        return self.line
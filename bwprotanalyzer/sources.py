@@ -0,0 +1,50 @@
+import glob
+import gzip
+import os
+import typing
+import zipfile
+
+from bwprotanalyzer.scanner import Block, iter_stream
+
+# Einträge in Zip-Archiven werden als <Archiv>.zip/<Eintrag> angesprochen
+ZIP_SEPARATOR = ".zip/"
+
+def expand_inputs(patterns: typing.Iterable[str]) -> typing.List[str]:
+    # Pfade, Globs und Zip-Archive zu einzelnen Eingaben auflösen, jeder Eintrag eines Zip-Archivs ist eine eigene Eingabe
+    inputs = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern)) if any(char in pattern for char in "*?[") else [pattern]
+        if not paths:
+            raise FileNotFoundError(f"keine Datei gefunden: {pattern}")
+        for path in paths:
+            if path.lower().endswith(".zip") and os.path.isfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    inputs.extend(f"{path}/{info.filename}" for info in archive.infolist() if not info.is_dir())
+            else:
+                inputs.append(path)
+    return inputs
+
+def zip_member(path: str) -> typing.Optional[typing.Tuple[str, str]]:
+    position = path.lower().find(ZIP_SEPARATOR)
+    if position == -1:
+        return None
+    return path[:position + 4], path[position + len(ZIP_SEPARATOR):]
+
+def is_stream(path: str) -> bool:
+    # Eingaben, die nur als Datenstrom gelesen werden können, ohne mmap, Checkpoint, Index und --jobs
+    return path.lower().endswith(".gz") or zip_member(path) is not None
+
+def open_stream(path: str) -> typing.BinaryIO:
+    # entpackt beim Lesen, ohne temporäre Dateien
+    member = zip_member(path)
+    if member is not None:
+        archive, name = member
+        # die Datei des Archivs bleibt geöffnet, bis der Eintrag geschlossen wird
+        return zipfile.ZipFile(archive).open(name)
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def scan_stream(path: str) -> typing.Iterator[Block]:
+    with open_stream(path) as fp:
+        yield from iter_stream(fp)
@@ -0,0 +1,201 @@
+import collections
+import contextlib
+import cProfile
+import functools
+import os
+import sys
+import time
+import typing
+
+from bwprotanalyzer.sources import is_stream
+
+# Methoden von Protocol, deren Zeit und Aufrufe gemessen werden; process_block enthält die übrigen
+TIMED_METHODS = ("process_block", "parse_pr_line", "parse_in_line", "parse_ae_line", "parse_timestamp", "update_field", "merge_field_map")
+PROGRESS_CHECK = 4096
+
+class TimedSink:
+    # misst Zeit und Umfang aller Schreibzugriffe auf sink
+
+    def __init__(self, sink: typing.TextIO, stats: "Stats") -> None:
+        self.sink = sink
+        self.stats = stats
+        self.encoding = getattr(sink, "encoding", None) or "utf-8"
+
+    def write(self, text: str) -> int:
+        start = time.perf_counter()
+        written = self.sink.write(text)
+        self.stats.timers["write"] += time.perf_counter() - start
+        self.stats.counters["write"] += 1
+        self.stats.bytes_written += len(text.encode(self.encoding, "replace"))
+        return written
+
+    def __getattr__(self, name: str):
+        return getattr(self.sink, name)
+
+class Stats:
+    # Zeiten und Zähler je Verarbeitungsstufe; wird nur auf Protocol-Instanzen angewendet, für die sie eingeschaltet ist
+
+    def __init__(self, progress_interval: float = 0, sink: typing.TextIO = sys.stderr) -> None:
+        self.progress_interval = progress_interval
+        self.sink = sink
+        self.timers: typing.Dict[str, float] = collections.defaultdict(float)
+        self.counters: typing.Dict[str, int] = collections.defaultdict(int)
+        self.entries = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.position = 0
+        self.field_map_size = 0
+        self.started = time.perf_counter()
+        self.next_progress = self.started + progress_interval
+
+    def attach(self, proto) -> None:
+        # ersetzt die Methoden nur auf dieser Instanz, ohne Statistik bleibt Protocol unverändert
+        for name in TIMED_METHODS:
+            setattr(proto, name, self.timed(name, getattr(proto, name)))
+        scan, process_blocks, report_error = proto.scan, proto.process_blocks, proto.report_error
+        load_protocol, query, write_log = proto.load_protocol, proto.query, proto.write_log
+
+        @functools.wraps(scan)
+        def timed_scan(start: int = 0, end: typing.Optional[int] = None):
+            # bei Archiven ist die entpackte Größe vorab unbekannt
+            if not is_stream(proto.file):
+                stop = os.path.getsize(proto.file) if end is None else end
+                self.bytes_read += max(0, stop - start)
+            return self.timed_iter("scan", scan(start, end))
+
+        @functools.wraps(process_blocks)
+        def counted_blocks(blocks):
+            yield from process_blocks(self.track_position(blocks))
+            # bei Filtern baut die Wiederholungs-Instanz aus Protocol.query die Feldhistorie auf, nicht load_protocol
+            self.field_map_size = len(proto.__field_map__)
+
+        @functools.wraps(report_error)
+        def counted_error(offset: int, error: Exception):
+            self.errors += 1
+            report_error(offset, error)
+
+        @functools.wraps(load_protocol)
+        def counted_load():
+            yield from self.count_entries(load_protocol())
+            self.field_map_size = len(proto.__field_map__)
+
+        @functools.wraps(query)
+        def counted_query(**filters):
+            return self.count_entries(query(**filters))
+
+        @functools.wraps(write_log)
+        def timed_write_log(sink, *args, **kwargs):
+            return write_log(TimedSink(sink, self), *args, **kwargs)
+
+        proto.scan = timed_scan
+        proto.process_blocks = counted_blocks
+        proto.report_error = counted_error
+        proto.load_protocol = counted_load
+        proto.query = counted_query
+        proto.write_log = timed_write_log
+
+    def totals(self) -> typing.Dict[str, typing.Any]:
+        # übertragbarer Stand, z.B. aus einem Worker-Prozess
+        return {"timers": dict(self.timers), "counters": dict(self.counters), "entries": self.entries, "errors": self.errors,
+                "bytes_read": self.bytes_read, "bytes_written": self.bytes_written, "field_map_size": self.field_map_size}
+
+    def merge(self, totals: typing.Dict[str, typing.Any]) -> None:
+        for name, seconds in totals["timers"].items():
+            self.timers[name] += seconds
+        for name, count in totals["counters"].items():
+            self.counters[name] += count
+        self.entries += totals["entries"]
+        self.errors += totals["errors"]
+        self.bytes_read += totals["bytes_read"]
+        self.bytes_written += totals["bytes_written"]
+        self.field_map_size += totals["field_map_size"]
+
+    def timed(self, name: str, function: typing.Callable) -> typing.Callable:
+        timers, counters, clock = self.timers, self.counters, time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timers[name] += clock() - start
+                counters[name] += 1
+        return wrapper
+
+    def timed_iter(self, name: str, iterable: typing.Iterable) -> typing.Iterator:
+        # misst die Zeit, die das Erzeugen der Elemente kostet, z.B. Dekodieren und Aufteilen der Blöcke
+        timers, counters, clock = self.timers, self.counters, time.perf_counter
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                timers[name] += clock() - start
+                return
+            timers[name] += clock() - start
+            counters[name] += 1
+            yield item
+
+    def track_position(self, blocks: typing.Iterable) -> typing.Iterator:
+        for block in blocks:
+            self.position = block[0]
+            yield block
+
+    def count_entries(self, entries: typing.Iterable) -> typing.Iterator:
+        for entry in entries:
+            self.entries += 1
+            if self.progress_interval and self.entries % PROGRESS_CHECK == 0 and time.perf_counter() >= self.next_progress:
+                self.progress()
+            yield entry
+
+    def file_finished(self, done: int, total: int) -> None:
+        # bei mehreren Eingaben zählen die Worker, der Hauptprozess meldet den Stand nach jeder fertigen Datei
+        if self.progress_interval and time.perf_counter() >= self.next_progress:
+            self.progress(f", {done}/{total} Dateien")
+
+    def progress(self, files: str = "") -> None:
+        now = time.perf_counter()
+        self.next_progress = now + self.progress_interval
+        elapsed = now - self.started
+        # bei --jobs laufen die Blöcke nicht durch diesen Prozess, dort gibt es keine Position
+        position = f", Position {self.position / 1_000_000:.1f} MB" if self.position else ""
+        self.sink.write(f"{elapsed:8.1f} s  {self.entries} Einträge ({self.entries / elapsed:.0f}/s){position}{files}\n")
+        self.sink.flush()
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        lines = [
+            f"Laufzeit:          {elapsed:.2f} s",
+            f"Einträge:          {self.entries} ({self.entries / elapsed:.0f}/s)" if elapsed else f"Einträge:          {self.entries}",
+            f"Blöcke:            {self.counters['process_block']}",
+            f"@AE-Zeilen:        {self.counters['parse_ae_line']}",
+            f"Fehler:            {self.errors}",
+            f"Feldhistorie:      {self.field_map_size} Felder",
+            f"gelesen:           {self.bytes_read / 1_000_000:.1f} MB",
+            f"geschrieben:       {self.bytes_written / 1_000_000:.1f} MB",
+            "Stufen:            Zeit s     Aufrufe",
+        ]
+        for name, seconds in sorted(self.timers.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<16} {seconds:8.2f} {self.counters[name]:>11}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> None:
+        self.sink.write(self.summary())
+        self.sink.flush()
+
+@contextlib.contextmanager
+def profiled(path: typing.Optional[str]) -> typing.Iterator[None]:
+    # schreibt ein cProfile-Abbild nach path, auswertbar z.B. mit python -m pstats oder snakeviz
+    if not path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
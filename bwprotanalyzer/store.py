@@ -0,0 +1,167 @@
+import array
+import datetime
+import itertools
+import pickle
+import typing
+
+from bwprotanalyzer.entry import ProtocolChange, ProtocolEntry, ProtocolStatus
+from bwprotanalyzer.timestamp import as_timestamp, from_timestamp
+
+# Einträge je ProtocolStore in einer Lauf-Datei, beim Zusammenführen ist je Datei nur ein Stück im Speicher
+RUN_PIECE_SIZE = 8192
+
+class StringTable:
+
+    def __init__(self) -> None:
+        self.codes: typing.Dict[str, int] = {}
+        self.strings: typing.List[str] = []
+
+    def code(self, string: str) -> int:
+        code = self.codes.get(string)
+        if code is None:
+            code = self.codes[string] = len(self.strings)
+            self.strings.append(string)
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.strings[code]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+class ProtocolStore:
+
+    def __init__(self) -> None:
+        self.strings = StringTable()
+
+        self.timestamps = array.array('q')
+        self.protocol_types = array.array('I')
+        self.users = array.array('I')
+        self.statuses = array.array('B')
+        self.indices = array.array('I')
+        self.infos = array.array('I')
+        self.index_infos = array.array('I')
+
+        # Änderungen von Eintrag i liegen in change_offsets[i]:change_offsets[i + 1]
+        self.change_offsets = array.array('I', [0])
+        self.change_fields = array.array('I')
+        self.change_values = array.array('I')
+        self.change_previous_values = array.array('I')
+
+    @classmethod
+    def from_entries(cls, entries: typing.Iterable[ProtocolEntry]) -> "ProtocolStore":
+        store = cls()
+        for entry in entries:
+            store.append(entry)
+        return store
+
+    def append(self, entry: ProtocolEntry) -> None:
+        code = self.strings.code
+        self.timestamps.append(as_timestamp(entry.date))
+        self.protocol_types.append(code(entry.protocol_type))
+        self.users.append(code(entry.user))
+        self.statuses.append(entry.status)
+        self.indices.append(code(entry.index))
+        self.infos.append(code(entry.info))
+        self.index_infos.append(code(entry.index_info))
+        for change in entry.changes:
+            self.change_fields.append(code(change.field))
+            self.change_values.append(code(change.value))
+            self.change_previous_values.append(code(change.previous_value))
+        self.change_offsets.append(len(self.change_fields))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, row: int) -> "StoredEntry":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return StoredEntry(self, row)
+
+    def __iter__(self) -> typing.Iterator["StoredEntry"]:
+        for row in range(len(self)):
+            yield StoredEntry(self, row)
+
+class StoredChange(ProtocolChange):
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: ProtocolStore, row: int) -> None:
+        self.store = store
+        self.row = row
+
+    @property
+    def field(self) -> str:
+        return self.store.strings[self.store.change_fields[self.row]]
+
+    @property
+    def value(self) -> str:
+        return self.store.strings[self.store.change_values[self.row]]
+
+    @property
+    def previous_value(self) -> str:
+        return self.store.strings[self.store.change_previous_values[self.row]]
+
+class StoredEntry(ProtocolEntry):
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: ProtocolStore, row: int) -> None:
+        self.store = store
+        self.row = row
+
+    @property
+    def protocol_type(self) -> str:
+        return self.store.strings[self.store.protocol_types[self.row]]
+
+    @property
+    def user(self) -> str:
+        return self.store.strings[self.store.users[self.row]]
+
+    @property
+    def date(self) -> datetime.datetime:
+        return from_timestamp(self.store.timestamps[self.row])
+
+    @property
+    def status(self) -> ProtocolStatus:
+        return ProtocolStatus(self.store.statuses[self.row])
+
+    @property
+    def index(self) -> str:
+        return self.store.strings[self.store.indices[self.row]]
+
+    @property
+    def changes(self) -> typing.List[StoredChange]:
+        offsets = self.store.change_offsets
+        return [StoredChange(self.store, row) for row in range(offsets[self.row], offsets[self.row + 1])]
+
+    @property
+    def info(self) -> str:
+        return self.store.strings[self.store.infos[self.row]]
+
+    @property
+    def index_info(self) -> str:
+        return self.store.strings[self.store.index_infos[self.row]]
+
+def write_run(entries: typing.Iterable[ProtocolEntry], path: str, piece_size: int = RUN_PIECE_SIZE) -> None:
+    # schreibt die Einträge als Folge kleiner ProtocolStores, die read_run einzeln wieder einliest
+    iterator = iter(entries)
+    with open(path, 'wb') as fp:
+        while True:
+            store = ProtocolStore.from_entries(itertools.islice(iterator, piece_size))
+            if not len(store):
+                return
+            pickle.dump(store, fp, pickle.HIGHEST_PROTOCOL)
+
+def read_run(path: str) -> typing.Iterator[StoredEntry]:
+    # die Datei ist nur während des Lesens eines Stücks geöffnet, damit auch sehr viele Läufe gleichzeitig gelesen werden können
+    position = 0
+    while True:
+        with open(path, 'rb') as fp:
+            fp.seek(position)
+            try:
+                store = pickle.load(fp)
+            except EOFError:
+                return
+            position = fp.tell()
+        yield from store
@@ -0,0 +1,215 @@
+import bisect
+import heapq
+import typing
+
+from bwprotanalyzer.entry import ProtocolEntry, ProtocolStatus
+from bwprotanalyzer.formatter import PROTOCOL_TYPES
+from bwprotanalyzer.timestamp import as_timestamp, from_timestamp
+
+TOP_K = 20
+# Space-Saving hält so viele Zähler je gesuchtem Platz, mehr Zähler verringern den Fehler
+COUNTERS_PER_RANK = 10
+SESSION_START = "000"
+SESSION_END = "001"
+# obere Grenzen der Klassen für Sitzungsdauern in Sekunden, darüber eine letzte offene Klasse
+SESSION_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 14400, 28800)
+HISTOGRAM_WIDTH = 40
+# Spalte in Summary.type_counts je Status
+TYPE_COLUMNS = {ProtocolStatus.DELETE: 0, ProtocolStatus.DELETE_THROUGH_PROCESSING: 1, ProtocolStatus.PRINT: 2}
+
+class TopK:
+    # ungefähre häufigste Schlüssel mit festem Speicher (Space-Saving); count überschätzt höchstens um error
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: typing.Dict[typing.Hashable, int] = {}
+        self.errors: typing.Dict[typing.Hashable, int] = {}
+        # je Schlüssel genau ein Eintrag, dessen Zählerstand veraltet sein darf
+        self.heap: typing.List[typing.Tuple[int, typing.Hashable]] = []
+
+    def add(self, key: typing.Hashable, count: int = 1) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.capacity:
+            counts[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self.heap, (count, key))
+        else:
+            minimum = self.evict()
+            counts[key] = minimum + count
+            self.errors[key] = minimum
+            heapq.heappush(self.heap, (minimum + count, key))
+
+    def evict(self) -> int:
+        # entfernt den Schlüssel mit dem kleinsten Zähler und liefert diesen
+        heap, counts = self.heap, self.counts
+        while True:
+            count, key = heap[0]
+            if counts[key] == count:
+                heapq.heappop(heap)
+                del counts[key]
+                del self.errors[key]
+                return count
+            heapq.heapreplace(heap, (counts[key], key))
+
+    def merge(self, other: "TopK") -> None:
+        # Zähler zusammenführen und auf capacity kürzen; Schlüssel, die nur einer Seite fehlen, erben deren kleinsten Zähler als Fehler
+        own_minimum = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        other_minimum = min(other.counts.values()) if len(other.counts) >= other.capacity else 0
+        counts, errors = {}, {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, own_minimum) + other.counts.get(key, other_minimum)
+            errors[key] = self.errors.get(key, own_minimum) + other.errors.get(key, other_minimum)
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, number: int) -> typing.List[typing.Tuple[typing.Hashable, int, int]]:
+        # (Schlüssel, Anzahl, Fehler), die tatsächliche Anzahl liegt zwischen Anzahl - Fehler und Anzahl
+        return [(key, self.counts[key], self.errors[key]) for key in heapq.nlargest(number, self.counts, key=self.counts.get)]
+
+class Histogram:
+
+    def __init__(self, bounds: typing.Sequence[int]) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.minimum: typing.Optional[int] = None
+        self.maximum: typing.Optional[int] = None
+
+    def add(self, value: int) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def merge(self, other: "Histogram") -> None:
+        self.buckets = [own + theirs for own, theirs in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+class Summary:
+    # Auswertung in einem Durchlauf mit festem Speicher je Benutzer, Bereich und Rang, unabhängig von der Anzahl der Einträge
+
+    def __init__(self, top: int = TOP_K) -> None:
+        self.top = top
+        self.entries = 0
+        self.first: typing.Optional[int] = None
+        self.last: typing.Optional[int] = None
+        # Änderungen je Benutzer und Stunde des Tages
+        self.user_hours: typing.Dict[str, typing.List[int]] = {}
+        self.records = TopK(top * COUNTERS_PER_RANK)
+        self.fields = TopK(top * COUNTERS_PER_RANK)
+        # gelöscht, durch Wandlung gelöscht, gedruckt je Bereich
+        self.type_counts: typing.Dict[str, typing.List[int]] = {}
+        self.sessions = Histogram(SESSION_BUCKETS)
+        self.open_sessions: typing.Dict[str, int] = {}
+        # Anmeldungen, auf die eine weitere Anmeldung statt einer Abmeldung folgt, und Abmeldungen ohne Anmeldung
+        self.unterminated = 0
+        self.unmatched = 0
+
+    def update(self, entries: typing.Iterable[ProtocolEntry]) -> "Summary":
+        add = self.add
+        for entry in entries:
+            add(entry)
+        return self
+
+    def add(self, entry: ProtocolEntry) -> None:
+        self.entries += 1
+        timestamp = as_timestamp(entry.date)
+        if self.first is None or timestamp < self.first:
+            self.first = timestamp
+        if self.last is None or timestamp > self.last:
+            self.last = timestamp
+        protocol_type = entry.protocol_type
+        # Bereiche mit fester Meldung zählen wie im Log unabhängig vom Status
+        if protocol_type in PROTOCOL_TYPES:
+            if protocol_type == SESSION_START:
+                if self.open_sessions.get(entry.user) is not None:
+                    self.unterminated += 1
+                self.open_sessions[entry.user] = timestamp
+            elif protocol_type == SESSION_END:
+                start = self.open_sessions.pop(entry.user, None)
+                if start is None:
+                    self.unmatched += 1
+                else:
+                    self.sessions.add(timestamp - start)
+            return
+        status = entry.status
+        if status == ProtocolStatus.CHANGE:
+            hours = self.user_hours.get(entry.user)
+            if hours is None:
+                hours = self.user_hours[entry.user] = [0] * 24
+            hours[timestamp % 86400 // 3600] += 1
+            self.records.add((protocol_type, entry.index))
+            for change in entry.changes:
+                if change.value != change.previous_value:
+                    self.fields.add((protocol_type, change.field))
+        elif status in TYPE_COLUMNS:
+            counts = self.type_counts.get(protocol_type)
+            if counts is None:
+                counts = self.type_counts[protocol_type] = [0, 0, 0]
+            counts[TYPE_COLUMNS[status]] += 1
+
+    def merge(self, other: "Summary") -> None:
+        # für getrennt ausgewertete Dateien; offene Sitzungen werden nicht dateiübergreifend verbunden
+        self.entries += other.entries
+        for value in (other.first, other.last):
+            if value is not None:
+                self.first = value if self.first is None else min(self.first, value)
+                self.last = value if self.last is None else max(self.last, value)
+        for user, hours in other.user_hours.items():
+            own = self.user_hours.setdefault(user, [0] * 24)
+            self.user_hours[user] = [mine + theirs for mine, theirs in zip(own, hours)]
+        self.records.merge(other.records)
+        self.fields.merge(other.fields)
+        for protocol_type, counts in other.type_counts.items():
+            own = self.type_counts.setdefault(protocol_type, [0, 0, 0])
+            self.type_counts[protocol_type] = [mine + theirs for mine, theirs in zip(own, counts)]
+        self.sessions.merge(other.sessions)
+        self.unterminated += other.unterminated + len(self.open_sessions)
+        self.open_sessions = dict(other.open_sessions)
+        self.unmatched += other.unmatched
+
+    def render(self) -> str:
+        lines = []
+        if self.first is None:
+            lines.append("Keine Einträge")
+        else:
+            lines.append(f"{self.entries} Einträge von {from_timestamp(self.first):%d.%m.%Y %H:%M:%S} bis {from_timestamp(self.last):%d.%m.%Y %H:%M:%S}")
+
+        lines += ["", "Änderungen je Benutzer und Stunde", f"{'Benutzer':<10} {'Summe':>7} " + " ".join(f"{hour:>5}" for hour in range(24))]
+        for user, hours in sorted(self.user_hours.items(), key=lambda item: -sum(item[1])):
+            lines.append(f"{user:<10} {sum(hours):>7} " + " ".join(f"{count:>5}" for count in hours))
+
+        lines += ["", "Am häufigsten geänderte Datensätze (Anzahl höchstens um Fehler zu hoch)", f"{'Bereich':<8} {'Datensatz':<24} {'Anzahl':>8} {'Fehler':>8}"]
+        lines += [f"{protocol_type:<8} {index:<24} {count:>8} {error:>8}" for (protocol_type, index), count, error in self.records.top(self.top)]
+
+        lines += ["", "Am häufigsten geänderte Felder (Anzahl höchstens um Fehler zu hoch)", f"{'Bereich':<8} {'Feld':<24} {'Anzahl':>8} {'Fehler':>8}"]
+        lines += [f"{protocol_type:<8} {field:<24} {count:>8} {error:>8}" for (protocol_type, field), count, error in self.fields.top(self.top)]
+
+        lines += ["", "Löschungen und Ausdrucke je Bereich", f"{'Bereich':<8} {'gelöscht':>10} {'Wandlung':>10} {'gedruckt':>10}"]
+        lines += [f"{protocol_type:<8} {deleted:>10} {converted:>10} {printed:>10}" for protocol_type, (deleted, converted, printed) in sorted(self.type_counts.items())]
+
+        sessions = self.sessions
+        lines += ["", f"Sitzungen ({SESSION_START}/{SESSION_END}): {sessions.count} abgeschlossen, {self.unterminated} ohne Abmeldung, "
+                      f"{len(self.open_sessions)} offen, {self.unmatched} Abmeldungen ohne Anmeldung"]
+        if sessions.count:
+            lines.append(f"Dauer: Durchschnitt {format_duration(sessions.total // sessions.count)}, kürzeste {format_duration(sessions.minimum)}, längste {format_duration(sessions.maximum)}")
+            largest = max(sessions.buckets)
+            labels = [f"bis {format_duration(bound)}" for bound in SESSION_BUCKETS] + [f"über {format_duration(SESSION_BUCKETS[-1])}"]
+            for label, count in zip(labels, sessions.buckets):
+                lines.append(f"{label:<14} {count:>8} {'#' * round(HISTOGRAM_WIDTH * count / largest)}")
+        return "\n".join(lines) + "\n"
+
+def format_duration(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
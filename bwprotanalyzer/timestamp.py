@@ -0,0 +1,62 @@
+import datetime
+import typing
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+SECOND = datetime.timedelta(seconds=1)
+DAY_SECONDS = 86400
+
+Timestamp = typing.Union[int, datetime.datetime]
+
+class InvalidTimestamp(ValueError):
+    pass
+
+def to_timestamp(date: datetime.datetime) -> int:
+    return (date - EPOCH) // SECOND
+
+def from_timestamp(timestamp: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(seconds=timestamp)
+
+def as_timestamp(value: Timestamp) -> int:
+    return value if isinstance(value, int) else to_timestamp(value)
+
+def as_datetime(value: Timestamp) -> datetime.datetime:
+    return from_timestamp(value) if isinstance(value, int) else value
+
+def parse_day(date: str) -> int:
+    # TT.MM.JJJJ über feste Spalten, datetime.date prüft Monat und Tag; andere Breiten wie 1.2.2020 über strptime
+    if len(date) == 10 and date[2] == "." and date[5] == "." and date[:2].isdigit() and date[3:5].isdigit() and date[6:].isdigit():
+        return (datetime.date(int(date[6:]), int(date[3:5]), int(date[:2])).toordinal() - EPOCH_ORDINAL) * DAY_SECONDS
+    return to_timestamp(datetime.datetime.strptime(date, "%d.%m.%Y"))
+
+def parse_time(time: str) -> int:
+    # HH:MM:SS über feste Spalten, andere Breiten wie 9:05:00 über strptime
+    if len(time) == 8 and time[2] == ":" and time[5] == ":" and time[:2].isdigit() and time[3:5].isdigit() and time[6:].isdigit():
+        hour, minute, second = int(time[:2]), int(time[3:5]), int(time[6:])
+        if hour > 23 or minute > 59 or second > 59:
+            raise ValueError(time)
+        return hour * 3600 + minute * 60 + second
+    parsed = datetime.datetime.strptime(time, "%H:%M:%S")
+    return parsed.hour * 3600 + parsed.minute * 60 + parsed.second
+
+class TimestampParser:
+
+    def __init__(self) -> None:
+        # Sekunden seit EPOCH je Datum bzw. Sekunden seit Mitternacht je Uhrzeit
+        self.days: typing.Dict[str, int] = {}
+        self.times: typing.Dict[str, int] = {}
+
+    def parse(self, date: str, time: str) -> int:
+        # @PR-Felder "14.11.2020" und "21:00:00", viele Einträge teilen sich Datum und Uhrzeit
+        try:
+            return self.days[date] + self.times[time]
+        except KeyError:
+            pass
+        try:
+            if date not in self.days:
+                self.days[date] = parse_day(date)
+            if time not in self.times:
+                self.times[time] = parse_time(time)
+        except ValueError:
+            raise InvalidTimestamp(f"ungültiger Zeitpunkt '{date} {time}'") from None
+        return self.days[date] + self.times[time]
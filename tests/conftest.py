@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.generate import generate
+
+# klein genug für schnelle Tests, groß genug für mehrere Fenster und Teilstücke bei --jobs
+SIZE = 600_000
+
+@pytest.fixture(scope="session")
+def protocol_file(tmp_path_factory) -> str:
+    # fester Startwert, damit ein Fehler mit derselben Datei nachvollzogen werden kann
+    path = tmp_path_factory.mktemp("data") / "BWPROT20.DAT"
+    generate(str(path), SIZE, seed=7, blank_lines=0.05)
+    return str(path)
+
+@pytest.fixture(scope="session")
+def protocol_data(protocol_file) -> bytes:
+    with open(protocol_file, 'rb') as fp:
+        return fp.read()
@@ -0,0 +1,101 @@
+import gzip
+import io
+import os
+import zipfile
+
+import pytest
+
+from benchmarks.generate import generate
+from bwprotanalyzer import Protocol
+from bwprotanalyzer.batch import FORMATTERS, output_name, run_batch
+from bwprotanalyzer.sources import expand_inputs
+
+def render(entries, output_format: str = "log") -> str:
+    sink = io.StringIO()
+    FORMATTERS[output_format]().write(entries, sink)
+    return sink.getvalue()
+
+def read(path: str, output_format: str = "log") -> str:
+    with open(path, 'r', encoding=FORMATTERS[output_format].encoding, newline="") as fp:
+        return fp.read()
+
+@pytest.fixture(scope="module")
+def inputs(protocol_file, protocol_data, tmp_path_factory):
+    # zwei Filialen mit überlappenden Zeiträumen, dazu dieselbe erste Datei als .gz und als Eintrag eines Zip-Archivs
+    directory = tmp_path_factory.mktemp("batch")
+    first, second = directory / "filiale1" / "BWPROT20.DAT", directory / "filiale2" / "BWPROT20.DAT"
+    first.parent.mkdir()
+    second.parent.mkdir()
+    first.write_bytes(protocol_data)
+    generate(str(second), 300_000, seed=8)
+    with gzip.open(directory / "filiale1.DAT.gz", 'wb') as fp:
+        fp.write(protocol_data)
+    with zipfile.ZipFile(directory / "archiv.zip", 'w') as archive:
+        archive.writestr("alt/", "")
+        archive.writestr("alt/BWPROT20.DAT", protocol_data)
+        archive.writestr("neu/BWPROT20.DAT", second.read_bytes())
+    return directory
+
+def test_output_name():
+    assert output_name(os.path.join("filiale1", "BWPROT20.DAT.gz"), "log") == "filiale1_BWPROT20.DAT.gz.log"
+    assert output_name("./archiv.zip/alt/BWPROT20.DAT", "csv") == "archiv.zip_alt_BWPROT20.DAT.csv"
+    assert output_name("/daten/BWPROT20.DAT", "sqlite") == "daten_BWPROT20.DAT.sqlite"
+
+def test_expand_inputs(inputs):
+    pattern = str(inputs / "filiale*" / "BWPROT20.DAT")
+    assert expand_inputs([pattern]) == [str(inputs / "filiale1" / "BWPROT20.DAT"), str(inputs / "filiale2" / "BWPROT20.DAT")]
+    archive = str(inputs / "archiv.zip")
+    # Verzeichnisse im Archiv sind keine Eingaben
+    assert expand_inputs([archive]) == [f"{archive}/alt/BWPROT20.DAT", f"{archive}/neu/BWPROT20.DAT"]
+    assert expand_inputs([str(inputs / "filiale1.DAT.gz")]) == [str(inputs / "filiale1.DAT.gz")]
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(inputs / "fehlt*.DAT")])
+
+@pytest.mark.parametrize("name", ["filiale1.DAT.gz", "archiv.zip/alt/BWPROT20.DAT"])
+def test_compressed_inputs_match_plain_file(inputs, protocol_file, name):
+    assert render(Protocol(str(inputs / name)).load_protocol()) == render(Protocol(protocol_file).load_protocol())
+
+@pytest.mark.parametrize("output_format", ["log", "csv"])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_merge_orders_by_date(inputs, tmp_path, jobs, output_format):
+    paths = [str(inputs / "filiale1" / "BWPROT20.DAT"), str(inputs / "filiale2" / "BWPROT20.DAT")]
+    entries = [entry for path in paths for entry in Protocol(path).load_protocol()]
+    dates = [entry.date for entry in entries]
+    assert len(set(dates)) < len(dates), "gleiche Zeitpunkte in beiden Dateien erwartet"
+    output = str(tmp_path / f"merged.{output_format}")
+    assert run_batch(Protocol, paths, jobs=jobs, output=output, output_format=output_format, merge=True)
+    # stabile Sortierung: bei gleichem Zeitpunkt zuerst die frühere Eingabe
+    assert read(output, output_format) == render(sorted(entries, key=lambda entry: entry.date), output_format)
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_stdout_keeps_input_order(inputs, capsys, jobs):
+    paths = [str(inputs / "filiale2" / "BWPROT20.DAT"), str(inputs / "archiv.zip" / "alt" / "BWPROT20.DAT")]
+    assert run_batch(Protocol, paths, jobs=jobs)
+    assert capsys.readouterr().out == "".join(render(Protocol(path).load_protocol()) for path in paths)
+
+@pytest.mark.parametrize("merge", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_unreadable_input_is_reported(inputs, tmp_path, capfd, jobs, merge):
+    # die unlesbare Datei steht zwischen zwei lesbaren, deren Ausgaben trotzdem vollständig sein müssen
+    broken = tmp_path / "kaputt.DAT.gz"
+    broken.write_bytes(b"kein gzip")
+    paths = [str(inputs / "filiale1" / "BWPROT20.DAT"), str(broken), str(inputs / "filiale2" / "BWPROT20.DAT")]
+    output = str(tmp_path / ("merged.log" if merge else "logs"))
+    assert not run_batch(Protocol, paths, jobs=jobs, output=output, merge=merge)
+    # Meldungen der Worker-Prozesse gehen direkt auf den Dateideskriptor
+    assert str(broken) in capfd.readouterr().err
+    readable = [paths[0], paths[2]]
+    if merge:
+        entries = [entry for path in readable for entry in Protocol(path).load_protocol()]
+        assert read(output) == render(sorted(entries, key=lambda entry: entry.date))
+    else:
+        assert sorted(os.listdir(output)) == sorted(output_name(path, "log") for path in readable)
+        for path in readable:
+            assert read(os.path.join(output, output_name(path, "log"))) == render(Protocol(path).load_protocol())
+
+def test_unreadable_input_on_stdout(inputs, tmp_path, capsys):
+    paths = [str(tmp_path / "fehlt.DAT"), str(inputs / "filiale2" / "BWPROT20.DAT")]
+    assert not run_batch(Protocol, paths)
+    captured = capsys.readouterr()
+    assert captured.out == render(Protocol(paths[1]).load_protocol())
+    assert "fehlt.DAT" in captured.err
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from bwprotanalyzer import Checkpoint, Protocol
+from bwprotanalyzer.export import SqliteExporter
+from bwprotanalyzer.timestamp import as_timestamp
+
+def key(entry) -> tuple:
+    return (as_timestamp(entry.date), entry.protocol_type, entry.user, int(entry.status), entry.index, entry.info, entry.index_info,
+            [(change.field, change.value, change.previous_value) for change in entry.changes])
+
+def read_entries(path: str) -> list:
+    # Einträge mit ihren Änderungen in der Reihenfolge von id und position
+    connection = sqlite3.connect(path)
+    try:
+        changes = {}
+        for entry_id, field, value, previous_value in connection.execute("SELECT entry_id, field, value, previous_value FROM changes ORDER BY entry_id, position"):
+            changes.setdefault(entry_id, []).append((field, value, previous_value))
+        rows = connection.execute("SELECT id, date, protocol_type, user, status, record, info, index_info FROM entries ORDER BY id").fetchall()
+    finally:
+        connection.close()
+    assert [row[0] for row in rows] == list(range(1, len(rows) + 1))
+    return [tuple(row[1:]) + (changes.get(row[0], []),) for row in rows]
+
+@pytest.fixture(scope="module")
+def serial_entries(protocol_file):
+    return list(Protocol(protocol_file).load_protocol())
+
+def test_schema(serial_entries, tmp_path):
+    # kleine Stapel, damit auch die Zwischen-Commits durchlaufen werden
+    path = str(tmp_path / "BWPROT20.sqlite")
+    SqliteExporter(path, batch_size=50).write(serial_entries)
+    assert read_entries(path) == [key(entry) for entry in serial_entries]
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT DISTINCT typeof(date) FROM entries").fetchall() == [("integer",)]
+        first = connection.execute("SELECT datetime(date, 'unixepoch') FROM entries WHERE id = 1").fetchone()[0]
+        assert first == str(serial_entries[0].date)
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"entries_date", "entries_user", "entries_record", "changes_entry"} <= indexes
+        plan = " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN SELECT * FROM entries WHERE user = '700' ORDER BY date"))
+        assert "entries_user" in plan
+    finally:
+        connection.close()
+
+def test_append_and_replace(serial_entries, tmp_path):
+    path = str(tmp_path / "BWPROT20.sqlite")
+    middle = len(serial_entries) // 2
+    SqliteExporter(path).write(serial_entries[:middle])
+    SqliteExporter(path, append=True).write(serial_entries[middle:])
+    assert read_entries(path) == [key(entry) for entry in serial_entries]
+    # ohne append wird die Datenbank ersetzt
+    SqliteExporter(path).write(serial_entries[:middle])
+    assert read_entries(path) == [key(entry) for entry in serial_entries[:middle]]
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_checkpoint_appends(protocol_data, serial_entries, tmp_path, jobs):
+    # die Datei wächst in drei Schritten, jeder Lauf hängt nur die neuen Blöcke an
+    first = protocol_data.index(b"\r\n@PR", len(protocol_data) // 3) + 2
+    second = protocol_data.index(b"\r\n@PR", 2 * len(protocol_data) // 3) + 2
+    path, database, state = tmp_path / "BWPROT20.DAT", str(tmp_path / "BWPROT20.sqlite"), str(tmp_path / "checkpoint.json")
+    for end in (first, second, len(protocol_data)):
+        path.write_bytes(protocol_data[:end])
+        Protocol(str(path), jobs=jobs, checkpoint=Checkpoint(state)).to_sqlite(database)
+    # der letzte Block folgt erst mit dem nächsten @PR
+    assert read_entries(database) == [key(entry) for entry in serial_entries[:-1]]
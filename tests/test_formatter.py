@@ -0,0 +1,120 @@
+import datetime
+import io
+import typing
+
+import pytest
+
+from bwprotanalyzer import LogFormatter, Protocol, ProtocolChange, ProtocolEntry, ProtocolStatus
+from bwprotanalyzer.formatter import PROTOCOL_TYPES
+
+# die if/elif-Kette aus Protocol.to_log_file vor der Umstellung auf Tabellen, unverändert bis auf die Rückgabe
+def baseline_line(entry: ProtocolEntry) -> typing.Optional[str]:
+    line = None
+    if entry.protocol_type == "000":
+        line = f"{entry.date}\t{entry.protocol_type}\tSTART\t{entry.user}\tBenutzer {entry.user} hat sich angemeldet"
+    elif entry.protocol_type == "001":
+        line = f"{entry.date}\t{entry.protocol_type}\tEND\t{entry.user}\tBenutzer {entry.user} hat sich abgemeldet"
+    elif entry.protocol_type == "020":
+        line = f"{entry.date}\t{entry.protocol_type}\tKASSESTART\t{entry.user}\tKasse {entry.user} hat sich angemeldet"
+    elif entry.protocol_type == "021":
+        line = f"{entry.date}\t{entry.protocol_type}\tKASSEEND\t{entry.user}\tKasse {entry.user} hat sich abgemeldet"
+    elif entry.protocol_type == "022":
+        line = f"{entry.date}\t{entry.protocol_type}\tKASSEDSTART\t{entry.user}\tKasse {entry.user} hat einen Tagesstart durchgeführt"
+    elif entry.protocol_type == "023":
+        line = f"{entry.date}\t{entry.protocol_type}\tKASSEDEND\t{entry.user}\tKasse {entry.user} hat einen Tagesabschluss durchgeführt"
+    elif entry.protocol_type == "031":
+        line = f"{entry.date}\t{entry.protocol_type}\tBELCORRECT\t{entry.user}\\Bediener {entry.user} hat einen fehlerhaften Beleg automatisch korrigiert: {entry.index}"
+    elif entry.protocol_type == "120":
+        line = f"{entry.date}\t{entry.protocol_type}\tNOTEDELETE\t{entry.user}\tBenutzer {entry.user} hat Notiztexte gelöscht"
+    elif entry.protocol_type == "121":
+        line = f"{entry.date}\t{entry.protocol_type}\tGLOBALCANCEL\t{entry.user}\tBenutzer {entry.user} hat einen globalen Abbruch verursacht: {entry.info}"
+    elif entry.protocol_type == "122":
+        line = f"{entry.date}\t{entry.protocol_type}\tREFERROR\t{entry.user}\tBenutzer {entry.user} hat einen Verweisfehler beim Laden einer Tabelle verursacht"
+    elif entry.protocol_type == "123":
+        line = f"{entry.date}\t{entry.protocol_type}\tDIFFINDSATZ\t{entry.user}\tBenutzer {entry.user} hat eine Differenz zwischen Index und Satz festgestellt"
+    elif entry.protocol_type == "126":
+        line = f"{entry.date}\t{entry.protocol_type}\tDUPLBELNR\t{entry.user}\tBenutzer {entry.user} hat versucht eine bestehende Belegnummer erneut anzulegen"
+    elif entry.protocol_type == "128":
+        line = f"{entry.date}\t{entry.protocol_type}\tWAWILSTART\t{entry.user}\tBenutzer {entry.user} hat eine WAWI-Liste gestartet"
+    elif entry.protocol_type == "130":
+        line = f"{entry.date}\t{entry.protocol_type}\tFIBULSTART\t{entry.user}\tBenutzer {entry.user} hat eine FIBU-Liste gestartet"
+    elif entry.protocol_type == "132":
+        line = f"{entry.date}\t{entry.protocol_type}\tIMPSTART\t{entry.user}\tBenutzer {entry.user} hat einen Datenimport gestartet"
+    elif entry.protocol_type == "134":
+        line = f"{entry.date}\t{entry.protocol_type}\tWANDLEND\t{entry.user}\tBenutzer {entry.user} hat die Wandlung eines Beleges abgeschlossen"
+    elif entry.protocol_type == "136":
+        line = f"{entry.date}\t{entry.protocol_type}\tWANDLKOMPSTART\t{entry.user}\tBenutzer {entry.user} hat eine Komplettwandlung gestartet"
+    elif entry.protocol_type == "138":
+        line = f"{entry.date}\t{entry.protocol_type}\tWANDLTEILSTART\t{entry.user}\tBenutzer {entry.user} hat eine Teilwandlung gestartet"
+    elif entry.protocol_type == "140":
+        line = f"{entry.date}\t{entry.protocol_type}\tBELPOSDELETE\t{entry.user}\tBenutzer {entry.user} hat eine Belegposition gelöscht"
+    elif entry.protocol_type == "142":
+        line = f"{entry.date}\t{entry.protocol_type}\tUPDWANDLTEIL\t{entry.user}\tBenutzer {entry.user} hat einen Beleg für eine Teilwandlung aufbereitet"
+    elif entry.protocol_type == "144":
+        line = f"{entry.date}\t{entry.protocol_type}\tBWTOOL4\t{entry.user}\tBenutzer {entry.user} hat eine Wandlung mit bwtool4 durchgeführt"
+    elif entry.protocol_type == "146":
+        line = f"{entry.date}\t{entry.protocol_type}\tTRYCATCH\t{entry.user}\tBenutzer {entry.user} hat einen try-Catch-Fehler verursacht"
+    elif entry.protocol_type == "148":
+        line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung gestartet"
+    elif entry.protocol_type == "150":
+        line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung abgeschlossen"
+    elif entry.protocol_type == "152":
+        line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABSTART\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle gestartet"
+    elif entry.protocol_type == "154":
+        line = f"{entry.date}\t{entry.protocol_type}\tTEMPBELSORTTABEND\t{entry.user}\tBenutzer {entry.user} hat eine temporäre Belegsortierung/Tabelle abgeschlossen"
+
+    if line:
+        return line
+
+    if entry.status == ProtocolStatus.NEW:
+        line = f"{entry.date}\t{entry.protocol_type}\tNEW\t{entry.user}\tBenutzer {entry.user} hat einen neuen Datensatz im Bereich {entry.protocol_type} angelegt: {entry.index}"
+    elif entry.status == ProtocolStatus.CHANGE:
+        line = f"{entry.date}\t{entry.protocol_type}\tCHANGE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} geändert:"
+        changes = [f"    {ch.field}: {ch.previous_value.strip()} -> {ch.value.strip()}" for ch in entry.changes if ch.value != ch.previous_value]
+        if changes:
+            changes_lines = "\n".join(changes)
+            line = line + "\n" + changes_lines
+        else:
+            line = line + " Keine erkennbaren Änderungen"
+    elif entry.status == ProtocolStatus.DELETE:
+        line = f"{entry.date}\t{entry.protocol_type}\tDELETE\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gelöscht"
+    elif entry.status == ProtocolStatus.PRINT:
+        line = f"{entry.date}\t{entry.protocol_type}\tPRINT\t{entry.user}\tBenutzer {entry.user} hat Datensatz {entry.index} im Bereich {entry.protocol_type} gedruckt"
+    elif entry.status == ProtocolStatus.DELETE_THROUGH_PROCESSING:
+        line = f"{entry.date}\t{entry.protocol_type}\tDELETEWANDL\t{entry.user}\tBenutzer {entry.user} hat Beleg {entry.index} durch Wandlung gelöscht"
+    return line
+
+def baseline(entries: typing.Iterable[ProtocolEntry]) -> str:
+    lines = (baseline_line(entry) for entry in entries)
+    return "".join(line + "\n" for line in lines if line)
+
+def render(entries: typing.Iterable[ProtocolEntry]) -> str:
+    sink = io.StringIO()
+    LogFormatter().write(entries, sink)
+    return sink.getvalue()
+
+def synthetic_entries() -> typing.List[ProtocolEntry]:
+    # jeder bekannte Bereich und ein unbekannter mit jedem Status, Änderungen mit und ohne Unterschied
+    date = datetime.datetime(2020, 2, 29, 23, 59, 58)
+    changes = [ProtocolChange("DBK018_0_1", " Müller  ", "Meier"), ProtocolChange("DBK018_0_2", "X", "X"), ProtocolChange("DBK018_0_3", "", "  W  ")]
+    entries = []
+    for protocol_type in [*PROTOCOL_TYPES, "018", "999"]:
+        for status in ProtocolStatus:
+            entries.append(ProtocolEntry(protocol_type, "700", date, status, "CON000001", changes, info="Info ä 1"))
+            entries.append(ProtocolEntry(protocol_type, "701", date, status, "", [ProtocolChange("F", "X", "X")]))
+    return entries
+
+def test_synthetic_entries_match_baseline():
+    entries = synthetic_entries()
+    assert render(entries) == baseline(entries)
+
+def test_fixture_matches_baseline(protocol_file):
+    entries = list(Protocol(protocol_file).load_protocol())
+    assert render(entries) == baseline(entries)
+
+@pytest.mark.parametrize("batch_size", [1, 7])
+def test_batches_match_baseline(protocol_file, batch_size):
+    entries = list(Protocol(protocol_file).load_protocol())
+    sink = io.StringIO()
+    LogFormatter().write(entries, sink, batch_size=batch_size)
+    assert sink.getvalue() == baseline(entries)
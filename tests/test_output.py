@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+from bwprotanalyzer import Checkpoint, LogFormatter, Protocol
+from bwprotanalyzer.batch import FORMATTERS
+from bwprotanalyzer.history import SpillingFieldHistory
+
+def render(entries, output_format: str = "log") -> str:
+    sink = io.StringIO()
+    FORMATTERS[output_format]().write(entries, sink)
+    return sink.getvalue()
+
+@pytest.fixture(scope="module")
+def serial_entries(protocol_file):
+    return list(Protocol(protocol_file).load_protocol())
+
+@pytest.mark.parametrize("output_format", ["log", "jsonl", "csv"])
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_jobs_match_serial(protocol_file, serial_entries, jobs, output_format):
+    assert render(Protocol(protocol_file, jobs=jobs).load_protocol(), output_format) == render(serial_entries, output_format)
+
+@pytest.mark.parametrize("capacity", [1, 50])
+def test_history_limit_matches_serial(protocol_file, serial_entries, capacity):
+    proto = Protocol(protocol_file, field_history=SpillingFieldHistory(capacity))
+    assert render(proto.load_protocol()) == render(serial_entries)
+
+def test_history_limit_with_jobs_matches_serial(protocol_file, serial_entries):
+    proto = Protocol(protocol_file, jobs=2, field_history=SpillingFieldHistory(50))
+    assert render(proto.load_protocol()) == render(serial_entries)
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_checkpoint_split_matches_serial(protocol_file, protocol_data, serial_entries, tmp_path, jobs):
+    # die Datei wächst in drei Schritten, der erste endet mitten in einem Block nach einer @AE-Zeile
+    first = protocol_data.index(b"\r\n", protocol_data.index(b"\r\n@AE", len(protocol_data) // 3) + 2) + 2
+    second = protocol_data.index(b"\r\n@PR", 2 * len(protocol_data) // 3) + 2
+    path, log, state = tmp_path / "BWPROT20.DAT", tmp_path / "BWPROT20.log", str(tmp_path / "checkpoint.json")
+    for end in (first, second, len(protocol_data)):
+        path.write_bytes(protocol_data[:end])
+        Protocol(str(path), jobs=jobs, checkpoint=Checkpoint(state)).to_log_file(str(log), formatter=LogFormatter())
+    # der letzte Block folgt erst mit dem nächsten @PR
+    assert log.read_text(encoding=LogFormatter.encoding) == render(serial_entries[:-1])
+
+def test_checkpoint_rescans_truncated_file(protocol_file, protocol_data, tmp_path):
+    path, log, state = tmp_path / "BWPROT20.DAT", tmp_path / "BWPROT20.log", str(tmp_path / "checkpoint.json")
+    path.write_bytes(protocol_data)
+    Protocol(str(path), checkpoint=Checkpoint(state)).to_log_file(str(log), formatter=LogFormatter())
+    shorter = protocol_data[:protocol_data.index(b"\r\n@PR", len(protocol_data) // 2) + 2]
+    path.write_bytes(shorter)
+    Protocol(str(path), checkpoint=Checkpoint(state)).to_log_file(str(log), formatter=LogFormatter())
+    expected = list(Protocol(str(path)).load_protocol())[:-1]
+    assert log.read_text(encoding=LogFormatter.encoding) == render(expected)
@@ -0,0 +1,83 @@
+import datetime
+import shutil
+import time
+
+import pytest
+
+from benchmarks.generate import generate
+from bwprotanalyzer import Protocol, ProtocolStatus
+from bwprotanalyzer.index import open_index
+
+def key(entry) -> tuple:
+    return (entry.date, entry.protocol_type, entry.user, entry.status, entry.index, entry.info, entry.index_info,
+            [(change.field, change.value, change.previous_value) for change in entry.changes])
+
+def matches(entry, user=None, protocol_type=None, index=None, status=None, since=None, until=None) -> bool:
+    return ((user is None or entry.user == user) and (protocol_type is None or entry.protocol_type == protocol_type)
+            and (index is None or entry.index == index) and (status is None or entry.status == status)
+            and (since is None or entry.date >= since) and (until is None or entry.date <= until))
+
+@pytest.fixture(scope="module")
+def indexed_file(protocol_file, tmp_path_factory) -> str:
+    # eigene Kopie, damit der Index neben der Datei nicht in andere Tests hineinreicht
+    path = str(tmp_path_factory.mktemp("query") / "BWPROT20.DAT")
+    shutil.copyfile(protocol_file, path)
+    return path
+
+@pytest.fixture(scope="module")
+def entries(indexed_file):
+    return list(Protocol(indexed_file).load_protocol())
+
+MIDDLE = datetime.datetime(2020, 1, 1, 13, 30, 0)
+
+FILTERS = [
+    {"user": "700"},
+    {"user": "719", "protocol_type": "018"},
+    {"index": "CON000000"},
+    {"index": "CON000042", "protocol_type": "060"},
+    {"protocol_type": "050"},
+    {"protocol_type": "000"},
+    {"status": ProtocolStatus.CHANGE},
+    {"status": ProtocolStatus.CHANGE, "since": MIDDLE},
+    {"user": "705", "until": MIDDLE},
+    {"since": MIDDLE, "until": MIDDLE + datetime.timedelta(hours=6)},
+    {"user": "nicht vorhanden"},
+]
+
+@pytest.mark.parametrize("filters", FILTERS, ids=lambda filters: ",".join(f"{name}={value}" for name, value in filters.items()))
+def test_query_matches_filtered_read(indexed_file, entries, filters):
+    expected = [key(entry) for entry in entries if matches(entry, **filters)]
+    assert [key(entry) for entry in Protocol(indexed_file).query(**filters)] == expected
+
+def test_query_after_append(indexed_file, entries, protocol_data, tmp_path):
+    # der Index wird nach dem Anhängen ergänzt, der zuvor letzte Block neu indiziert
+    path = tmp_path / "BWPROT20.DAT"
+    middle = protocol_data.index(b"\r\n@AE", len(protocol_data) // 2) + 2
+    path.write_bytes(protocol_data[:middle])
+    list(Protocol(str(path)).query(user="700"))
+    path.write_bytes(protocol_data)
+    expected = [key(entry) for entry in entries if entry.user == "700"]
+    assert [key(entry) for entry in Protocol(str(path)).query(user="700")] == expected
+
+def fastest(function, repeat: int = 3) -> float:
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+def test_broad_query_is_faster_than_full_read(tmp_path):
+    # viele Datensätze, von denen wenige sehr oft geändert werden; ein breiter Filter darf nicht je Block alle Blöcke durchsuchen
+    path = str(tmp_path / "BWPROT20.DAT")
+    generate(path, 3_000_000, seed=11)
+    entries = list(Protocol(path).load_protocol())
+    filters = {"status": ProtocolStatus.CHANGE, "since": entries[len(entries) // 2].date}
+    read_seconds = fastest(lambda: list(Protocol(path).load_protocol()))
+    with open_index(Protocol(path)) as index:
+        select_seconds = fastest(lambda: index.select(**filters))
+    assert select_seconds < read_seconds
+    expected = [key(entry) for entry in entries if matches(entry, **filters)]
+    assert [key(entry) for entry in Protocol(path).query(**filters)] == expected
+    hot = {"index": "CON000000", "status": ProtocolStatus.CHANGE}
+    assert [key(entry) for entry in Protocol(path).query(**hot)] == [key(entry) for entry in entries if matches(entry, **hot)]
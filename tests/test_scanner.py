@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+
+from bwprotanalyzer import scanner
+from bwprotanalyzer.scanner import ENCODING, scan_file
+from bwprotanalyzer.sources import scan_stream
+
+def baseline_blocks(path: str):
+    # Zerlegung wie die ursprüngliche Schleife im Textmodus, zusätzlich mit dem letzten Block
+    blocks = []
+    with open(path, 'r', encoding=ENCODING) as fp:
+        for line in fp:
+            if line.strip() == "":
+                continue
+            if line[:3] == "@PR":
+                blocks.append([])
+            blocks[-1].append(line[:-1] if line.endswith("\n") else line)
+    return blocks
+
+def mixed_newlines(data: bytes) -> bytes:
+    middle = data.index(b"\r\n@PR", len(data) // 2)
+    return data[:middle].replace(b"\r\n", b"\n") + data[middle:]
+
+def blank_lines(data: bytes) -> bytes:
+    # leere, nur aus Leerzeichen bestehende und Leerzeilen direkt vor @PR
+    return data.replace(b"\r\n@AE", b"\r\n\r\n \t\r\n@AE").replace(b"\r\n@PR", b"\r\n\r\n@PR")
+
+VARIANTS = {
+    "crlf": lambda data: data,
+    "lf": lambda data: data.replace(b"\r\n", b"\n"),
+    "mixed": mixed_newlines,
+    "blank_lines": blank_lines,
+    "blank_lines_lf": lambda data: blank_lines(data).replace(b"\r\n", b"\n"),
+    "trailing_block_without_newline": lambda data: data.rstrip(b"\r\n"),
+    "trailing_pr_line": lambda data: data + b"@PR",
+    "leading_blank_lines": lambda data: b"\r\n  \r\n" + data,
+}
+
+@pytest.fixture(params=list(VARIANTS))
+def variant_file(request, protocol_data, tmp_path) -> str:
+    path = tmp_path / f"{request.param}.DAT"
+    path.write_bytes(VARIANTS[request.param](protocol_data))
+    return str(path)
+
+def test_scanner_matches_baseline(variant_file):
+    expected = baseline_blocks(variant_file)
+    blocks = list(scan_file(variant_file))
+    assert [lines for offset, lines in blocks] == expected
+
+def test_offsets_point_to_blocks(variant_file):
+    with open(variant_file, 'rb') as fp:
+        data = fp.read()
+    for offset, lines in scan_file(variant_file):
+        assert data[offset:offset + 3] == b"@PR"
+
+def test_small_windows_match_baseline(variant_file, monkeypatch):
+    # Fenstergrenzen fallen so in viele verschiedene Blöcke
+    monkeypatch.setattr(scanner, "WINDOW_SIZE", 997)
+    assert [lines for offset, lines in scan_file(variant_file)] == baseline_blocks(variant_file)
+
+def test_stream_matches_baseline(variant_file, tmp_path):
+    archive = tmp_path / "BWPROT20.DAT.gz"
+    with open(variant_file, 'rb') as source, gzip.open(archive, 'wb') as target:
+        target.write(source.read())
+    assert [lines for offset, lines in scan_stream(str(archive))] == baseline_blocks(variant_file)
+
+def test_partial_range_starts_at_block(protocol_file, protocol_data):
+    # ein Bereich, der mitten in einem Block beginnt, setzt am nächsten @PR fort
+    start = protocol_data.index(b"\r\n@AE", len(protocol_data) // 3) + 2
+    blocks = list(scan_file(protocol_file, start))
+    assert blocks[0][0] == protocol_data.index(b"\n@PR", start) + 1
+    assert [lines for offset, lines in blocks] == baseline_blocks(protocol_file)[-len(blocks):]
@@ -0,0 +1,24 @@
+import shutil
+
+import pytest
+
+from bwprotanalyzer import Protocol
+from bwprotanalyzer.stats import Stats
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_load_reports_field_history(protocol_file, jobs):
+    stats = Stats()
+    proto = Protocol(protocol_file, jobs=jobs, stats=stats)
+    entries = list(proto.load_protocol())
+    assert stats.entries == len(entries)
+    assert stats.field_map_size == len(proto.__field_map__) > 0
+
+def test_query_reports_field_history(protocol_file, tmp_path):
+    # die Feldhistorie einer gefilterten Abfrage liegt in der Wiederholungs-Instanz
+    path = str(tmp_path / "BWPROT20.DAT")
+    shutil.copyfile(protocol_file, path)
+    stats = Stats()
+    entries = list(Protocol(path, stats=stats).query(user="700"))
+    assert stats.entries == len(entries) > 0
+    assert stats.field_map_size > 0
+    assert "Feldhistorie:      0 Felder" not in stats.summary()
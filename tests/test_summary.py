@@ -0,0 +1,129 @@
+import collections
+import random
+
+import pytest
+
+from bwprotanalyzer import Protocol, ProtocolStatus
+from bwprotanalyzer.formatter import PROTOCOL_TYPES
+from bwprotanalyzer.summary import SESSION_BUCKETS, SESSION_END, SESSION_START, TYPE_COLUMNS, Histogram, Summary, TopK
+from bwprotanalyzer.timestamp import as_timestamp
+
+def assert_bounds(top: TopK, exact: collections.Counter, total: int) -> None:
+    # Space-Saving: count - error <= tatsächliche Anzahl <= count, jeder Schlüssel mit mehr als total / capacity ist enthalten
+    for key, count in top.counts.items():
+        assert count - top.errors[key] <= exact[key] <= count
+    for key, count in exact.items():
+        if count > total / top.capacity:
+            assert key in top.counts
+
+def skewed_keys(seed: int, number: int):
+    rng = random.Random(seed)
+    return [f"k{int(rng.paretovariate(1.2))}" for _ in range(number)]
+
+def test_topk_bounds():
+    keys = skewed_keys(1, 20000)
+    top = TopK(30)
+    for key in keys:
+        top.add(key)
+    assert_bounds(top, collections.Counter(keys), len(keys))
+
+def test_topk_merge_bounds():
+    first, second = skewed_keys(2, 15000), skewed_keys(3, 5000)
+    top, other = TopK(30), TopK(30)
+    for key in first:
+        top.add(key)
+    for key in second:
+        other.add(key)
+    top.merge(other)
+    assert len(top.counts) <= top.capacity
+    assert_bounds(top, collections.Counter(first + second), len(first) + len(second))
+
+def test_histogram_merge():
+    values = [5, 60, 61, 299, 3600, 100000, 0, 900]
+    whole, first, second = Histogram(SESSION_BUCKETS), Histogram(SESSION_BUCKETS), Histogram(SESSION_BUCKETS)
+    for value in values:
+        whole.add(value)
+    for value in values[:3]:
+        first.add(value)
+    for value in values[3:]:
+        second.add(value)
+    first.merge(second)
+    assert (first.buckets, first.count, first.total, first.minimum, first.maximum) == (whole.buckets, whole.count, whole.total, whole.minimum, whole.maximum)
+    empty = Histogram(SESSION_BUCKETS)
+    empty.merge(whole)
+    assert (empty.minimum, empty.maximum) == (0, 100000)
+
+def exact_summary(entries):
+    # dieselbe Auswertung mit exakten Zählern
+    user_hours = collections.defaultdict(lambda: [0] * 24)
+    records, fields = collections.Counter(), collections.Counter()
+    type_counts = collections.defaultdict(lambda: [0, 0, 0])
+    durations, open_sessions = [], {}
+    unterminated = unmatched = 0
+    for entry in entries:
+        timestamp = as_timestamp(entry.date)
+        if entry.protocol_type == SESSION_START:
+            unterminated += entry.user in open_sessions
+            open_sessions[entry.user] = timestamp
+        elif entry.protocol_type == SESSION_END:
+            if entry.user in open_sessions:
+                durations.append(timestamp - open_sessions.pop(entry.user))
+            else:
+                unmatched += 1
+        elif entry.protocol_type in PROTOCOL_TYPES:
+            continue
+        elif entry.status == ProtocolStatus.CHANGE:
+            user_hours[entry.user][timestamp % 86400 // 3600] += 1
+            records[(entry.protocol_type, entry.index)] += 1
+            fields.update((entry.protocol_type, change.field) for change in entry.changes if change.value != change.previous_value)
+        elif entry.status in TYPE_COLUMNS:
+            type_counts[entry.protocol_type][TYPE_COLUMNS[entry.status]] += 1
+    return dict(user_hours), records, fields, dict(type_counts), durations, len(open_sessions), unterminated, unmatched
+
+@pytest.fixture(scope="module")
+def entries(protocol_file):
+    return list(Protocol(protocol_file).load_protocol())
+
+@pytest.fixture(scope="module")
+def exact(entries):
+    return exact_summary(entries)
+
+def check(summary: Summary, entries, exact) -> None:
+    user_hours, records, fields, type_counts, durations, still_open, unterminated, unmatched = exact
+    timestamps = [as_timestamp(entry.date) for entry in entries]
+    assert (summary.entries, summary.first, summary.last) == (len(entries), min(timestamps), max(timestamps))
+    assert summary.user_hours == user_hours
+    assert summary.type_counts == type_counts
+    assert_bounds(summary.records, records, sum(records.values()))
+    assert_bounds(summary.fields, fields, sum(fields.values()))
+    assert (summary.sessions.count, summary.sessions.total) == (len(durations), sum(durations))
+    assert (summary.sessions.minimum, summary.sessions.maximum) == (min(durations), max(durations))
+    assert (len(summary.open_sessions), summary.unterminated, summary.unmatched) == (still_open, unterminated, unmatched)
+
+def test_summary_matches_exact_counts(protocol_file, entries, exact):
+    check(Protocol(protocol_file).summarize(), entries, exact)
+
+def test_raw_timestamps_and_jobs_match(protocol_file, entries, exact):
+    # --summary liest mit Sekunden statt datetime, --jobs liefert StoredEntry mit datetime
+    serial = Protocol(protocol_file).summarize().render()
+    for proto in (Protocol(protocol_file, raw_timestamps=True), Protocol(protocol_file, jobs=2)):
+        summary = proto.summarize()
+        check(summary, entries, exact)
+        assert summary.render() == serial
+
+def test_summary_merge(entries, exact):
+    # zusammengeführte Teile zählen exakt wie das Ganze, Sitzungen werden nicht über die Teilgrenze verbunden
+    middle = len(entries) // 2
+    first, second = Summary().update(entries[:middle]), Summary().update(entries[middle:])
+    first.merge(second)
+    user_hours, records, fields, type_counts = exact[:4]
+    assert first.entries == len(entries)
+    assert first.user_hours == user_hours
+    assert first.type_counts == type_counts
+    assert_bounds(first.records, records, sum(records.values()))
+    assert_bounds(first.fields, fields, sum(fields.values()))
+    parts = [exact_summary(entries[:middle]), exact_summary(entries[middle:])]
+    assert first.sessions.count == len(parts[0][4]) + len(parts[1][4])
+    assert first.unterminated == parts[0][6] + parts[0][5] + parts[1][6]
+    assert first.unmatched == parts[0][7] + parts[1][7]
+    assert len(first.open_sessions) == parts[1][5]
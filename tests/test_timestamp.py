@@ -0,0 +1,79 @@
+import datetime
+import gzip
+
+import pytest
+
+from bwprotanalyzer import Protocol
+from bwprotanalyzer.timestamp import InvalidTimestamp, TimestampParser, parse_day, parse_time, to_timestamp
+
+def strptime_day(date: str) -> int:
+    return to_timestamp(datetime.datetime.strptime(date, "%d.%m.%Y"))
+
+def strptime_time(time: str) -> int:
+    parsed = datetime.datetime.strptime(time, "%H:%M:%S")
+    return parsed.hour * 3600 + parsed.minute * 60 + parsed.second
+
+DAYS = ["01.01.1970", "14.11.2020", "29.02.2020", "29.02.2000", "28.02.2021", "01.03.2021", "31.12.2099", "1.2.2020", "01.2.2020", "1.02.2020"]
+INVALID_DAYS = ["29.02.2021", "29.02.1900", "31.04.2020", "00.01.2020", "01.13.2020", "01.00.2020", "1x.01.2020", "01-01-2020", "", "01.01.20200"]
+TIMES = ["00:00:00", "09:05:00", "23:59:59", "12:00:07", "9:05:00", "09:5:00", "9:5:7"]
+INVALID_TIMES = ["24:00:00", "23:60:00", "23:59:60", "99:99:99", "-1:00:00", "ab:cd:ef", "09.05.00", "", "09:05:00:00"]
+
+@pytest.mark.parametrize("date", DAYS)
+def test_parse_day_matches_strptime(date):
+    assert parse_day(date) == strptime_day(date)
+
+@pytest.mark.parametrize("date", INVALID_DAYS)
+def test_parse_day_rejects_like_strptime(date):
+    with pytest.raises(ValueError):
+        strptime_day(date)
+    with pytest.raises(ValueError):
+        parse_day(date)
+
+@pytest.mark.parametrize("time", TIMES)
+def test_parse_time_matches_strptime(time):
+    assert parse_time(time) == strptime_time(time)
+
+@pytest.mark.parametrize("time", INVALID_TIMES)
+def test_parse_time_rejects_like_strptime(time):
+    with pytest.raises(ValueError):
+        strptime_time(time)
+    with pytest.raises(ValueError):
+        parse_time(time)
+
+def test_parser_caches_and_reports():
+    parser = TimestampParser()
+    assert parser.parse("29.02.2020", "23:59:59") == to_timestamp(datetime.datetime(2020, 2, 29, 23, 59, 59))
+    assert parser.parse("1.3.2020", "0:00:00") == to_timestamp(datetime.datetime(2020, 3, 1))
+    # ein ungültiger Wert landet nicht im Cache, der gültige Teil bleibt nutzbar
+    with pytest.raises(InvalidTimestamp, match="29.02.2021 12:00:00"):
+        parser.parse("29.02.2021", "12:00:00")
+    with pytest.raises(InvalidTimestamp):
+        parser.parse("29.02.2020", "24:00:00")
+    assert "29.02.2021" not in parser.days and "24:00:00" not in parser.times
+    assert parser.parse("29.02.2020", "12:00:00") == to_timestamp(datetime.datetime(2020, 2, 29, 12))
+
+def damage(data: bytes, fraction: float, replacement: bytes) -> bytes:
+    # Datum der ersten @PR-Zeile ab dem Anteil fraction ersetzen
+    start = data.index(b"\n@PR", int(len(data) * fraction)) + 1
+    date = data.index(b",", data.index(b",", start + 4) + 1) + 1
+    return data[:date] + replacement + data[date + 10:]
+
+def line_of(data: bytes, replacement: bytes) -> int:
+    return data[:data.index(replacement)].count(b"\n") + 1
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("compressed", [False, True])
+def test_invalid_timestamp_reports_line(protocol_file, protocol_data, tmp_path, capfd, jobs, compressed):
+    # zwei Blöcke mit ungültigem Datum werden mit ihrer Zeilennummer gemeldet und übersprungen
+    data = damage(damage(protocol_data, 0.7, b"31.02.2020"), 0.3, b"29.02.2021")
+    path = tmp_path / ("BWPROT20.DAT.gz" if compressed else "BWPROT20.DAT")
+    if compressed:
+        with gzip.open(path, 'wb') as fp:
+            fp.write(data)
+    else:
+        path.write_bytes(data)
+    entries = list(Protocol(str(path), jobs=jobs).load_protocol())
+    assert len(entries) == len(list(Protocol(protocol_file).load_protocol())) - 2
+    err = capfd.readouterr().err
+    for replacement in (b"29.02.2021", b"31.02.2020"):
+        assert f"{path}, Zeile {line_of(data, replacement)}: ungültiger Zeitpunkt '{replacement.decode()} " in err